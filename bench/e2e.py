@@ -0,0 +1,306 @@
+"""
+End-to-end benchmark: MCP clients calling the server over streamable HTTP
+and stdio, with Polygon replaced by bench/mock_polygon.py.
+
+For each tool in the workload, ``--clients`` concurrent clients make
+``--calls`` calls each. Reported per transport and tool: throughput, p50
+and p99 latency as seen by the client, errors, and the server's peak RSS
+(Linux only). Over stdio every client has a server process of its own, as
+does every worker with MCP_WORKERS set, so RSS is the largest of them.
+
+    uv run python bench/e2e.py --clients 16 --calls 50 --latency 40 --jitter 20
+
+Identical concurrent calls share one upstream request, and reference
+endpoints are cached, as in production. Vary ``--latency`` and
+``--rate-429`` to see how the server behaves against a slow or throttling
+upstream.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Tool name -> arguments. Every call hits a fixture in bench/fixtures.
+WORKLOAD: Dict[str, Dict[str, Any]] = {
+    "get_market_status": {},
+    "get_previous_close_agg": {"ticker": "AAPL"},
+    "get_ticker_details": {"ticker": "AAPL"},
+    "get_snapshot_ticker": {"market_type": "stocks", "ticker": "AAPL"},
+    "get_last_trade": {"ticker": "AAPL"},
+    "list_tickers": {"search": "apple", "limit": 100},
+    "list_ticker_news": {"ticker": "AAPL", "limit": 1000},
+    "get_grouped_daily_aggs": {"date": "2025-06-16"},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Nothing listening on port {port}")
+            await asyncio.sleep(0.1)
+
+
+def rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def child_pids(parent: int, exclude: Tuple[int, ...] = ()) -> List[int]:
+    """
+    Processes started by ``parent``, e.g. the stdio servers or the HTTP
+    server's workers.
+    """
+    pids = []
+    for entry in Path("/proc").glob("[0-9]*"):
+        try:
+            ppid = int((entry / "stat").read_text().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == parent and int(entry.name) not in exclude:
+            pids.append(int(entry.name))
+    return pids
+
+
+class RSSSampler:
+    """
+    Highest resident set size of the watched processes, sampled every
+    ``interval`` seconds while running.
+    """
+
+    def __init__(self, pids: List[int], interval: float = 0.02):
+        self.pids = pids
+        self.interval = interval
+        self.peak: Optional[int] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def _sample(self) -> None:
+        while True:
+            for pid in self.pids:
+                rss = rss_bytes(pid)
+                if rss is not None and (self.peak is None or rss > self.peak):
+                    self.peak = rss
+            await asyncio.sleep(self.interval)
+
+    def __enter__(self) -> "RSSSampler":
+        self._task = asyncio.ensure_future(self._sample())
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+def server_env(polygon_url: str, **extra: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        POLYGON_API_KEY=env.get("POLYGON_API_KEY") or "bench",
+        POLYGON_BASE_URL=polygon_url,
+        PYTHONPATH=os.pathsep.join(
+            filter(None, [str(ROOT / "src"), env.get("PYTHONPATH")])
+        ),
+        **extra,
+    )
+    return env
+
+
+@asynccontextmanager
+async def http_sessions(
+    clients: int, polygon_url: str
+) -> AsyncIterator[Tuple[List[ClientSession], List[int]]]:
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-c", "from mcp_polygon import run_web; run_web()"],
+        env=server_env(
+            polygon_url,
+            MCP_TRANSPORT="streamable-http",
+            HOST="127.0.0.1",
+            PORT=str(port),
+        ),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_for_port(port)
+        async with AsyncExitStack() as stack:
+            sessions = []
+            for _ in range(clients):
+                read, write, _ = await stack.enter_async_context(
+                    streamablehttp_client(f"http://127.0.0.1:{port}/mcp")
+                )
+                session = await stack.enter_async_context(ClientSession(read, write))
+                await session.initialize()
+                sessions.append(session)
+            yield sessions, [server.pid, *child_pids(server.pid)]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+@asynccontextmanager
+async def stdio_sessions(
+    clients: int, polygon_url: str, exclude: Tuple[int, ...]
+) -> AsyncIterator[Tuple[List[ClientSession], List[int]]]:
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=["-c", "from mcp_polygon import run_stdio; run_stdio()"],
+        env=server_env(polygon_url, MCP_TRANSPORT="stdio"),
+    )
+    async with AsyncExitStack() as stack:
+        sessions = []
+        for _ in range(clients):
+            read, write = await stack.enter_async_context(
+                stdio_client(params, errlog=open(os.devnull, "w"))
+            )
+            session = await stack.enter_async_context(ClientSession(read, write))
+            await session.initialize()
+            sessions.append(session)
+        yield sessions, child_pids(os.getpid(), exclude)
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_tool(
+    sessions: List[ClientSession], pids: List[int], tool: str, calls: int
+) -> Dict[str, Any]:
+    arguments = WORKLOAD[tool]
+    latencies: List[float] = []
+    errors = 0
+    response_bytes = 0
+
+    async def client(session: ClientSession) -> None:
+        nonlocal errors, response_bytes
+        for _ in range(calls):
+            start = time.perf_counter()
+            try:
+                result = await session.call_tool(tool, arguments)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            text = "".join(getattr(item, "text", "") for item in result.content)
+            response_bytes += len(text)
+            if result.isError or '"error"' in text[:32]:
+                errors += 1
+
+    with RSSSampler(pids) as sampler:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(session) for session in sessions))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "tool": tool,
+        "calls": len(sessions) * calls,
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else None,
+        "response_kb": response_bytes / max(1, len(latencies)) / 1024,
+        "peak_rss_mb": sampler.peak / 2**20 if sampler.peak else None,
+    }
+
+
+def print_table(transport: str, rows: List[Dict[str, Any]]) -> None:
+    def fmt(value: Optional[float], spec: str) -> str:
+        return "-" if value is None else format(value, spec)
+
+    print(f"\n{transport}")
+    print(
+        f"{'tool':<26} {'calls':>6} {'errors':>6} {'calls/s':>9} "
+        f"{'p50 ms':>8} {'p99 ms':>8} {'resp KB':>8} {'RSS MB':>7}"
+    )
+    for row in rows:
+        print(
+            f"{row['tool']:<26} {row['calls']:>6} {row['errors']:>6} "
+            f"{row['throughput']:>9.1f} {fmt(row['p50_ms'], '8.1f')} "
+            f"{fmt(row['p99_ms'], '8.1f')} {row['response_kb']:>8.1f} "
+            f"{fmt(row['peak_rss_mb'], '7.1f')}"
+        )
+
+
+async def main(args: argparse.Namespace) -> Dict[str, List[Dict[str, Any]]]:
+    mock_port = free_port()
+    mock = subprocess.Popen(
+        [
+            sys.executable,
+            str(ROOT / "bench" / "mock_polygon.py"),
+            f"--port={mock_port}",
+            f"--latency={args.latency}",
+            f"--jitter={args.jitter}",
+            f"--rate-429={args.rate_429}",
+            "--seed=0",
+        ]
+    )
+    polygon_url = f"http://127.0.0.1:{mock_port}"
+    tools = args.tools or list(WORKLOAD)
+    report: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        await wait_for_port(mock_port)
+        for transport in args.transports:
+            if transport == "http":
+                sessions = http_sessions(args.clients, polygon_url)
+            else:
+                sessions = stdio_sessions(args.clients, polygon_url, (mock.pid,))
+            async with sessions as (clients, pids):
+                rows = []
+                for tool in tools:
+                    rows.append(await run_tool(clients, pids, tool, args.calls))
+            report[transport] = rows
+            print_table(transport, rows)
+    finally:
+        mock.terminate()
+        mock.wait()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--transports", nargs="+", choices=("http", "stdio"), default=["http", "stdio"]
+    )
+    parser.add_argument("--tools", nargs="+", choices=list(WORKLOAD))
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=25, help="calls per client")
+    parser.add_argument("--latency", type=float, default=0, help="upstream ms")
+    parser.add_argument("--jitter", type=float, default=0, help="upstream extra ms")
+    parser.add_argument("--rate-429", type=float, default=0)
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
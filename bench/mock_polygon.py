@@ -0,0 +1,196 @@
+"""
+Stand-in for the Polygon REST API that replays recorded responses.
+
+Each fixture in bench/fixtures is a JSON file:
+
+    {
+        "route": "/v2/aggs/ticker/{ticker}/prev",
+        "status": 200,
+        "body": {...},
+        "repeat": 10000
+    }
+
+``route`` segments in braces match any value and the query string is
+ignored. With ``repeat`` set, ``body["results"]`` is cycled up to that many
+rows, which keeps large fixtures small on disk. Unmatched paths get a 404.
+
+Latency, jitter and rate limiting are injected per request. ``--record``
+proxies every request to Polygon instead and saves the responses as
+fixtures with literal routes, ready to be replayed.
+
+    python bench/mock_polygon.py --port 8765 --latency 40 --jitter 20 --rate-429 0.02
+    POLYGON_BASE_URL=http://127.0.0.1:8765 uv run mcp_polygon
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+import urllib3
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+Fixture = Tuple[Pattern[str], int, bytes]
+
+
+def _route_pattern(route: str) -> Pattern[str]:
+    parts = re.split(r"(\{[^/}]+\})", route)
+    return re.compile(
+        "".join("[^/]+" if part.startswith("{") else re.escape(part) for part in parts)
+        + "$"
+    )
+
+
+def load_fixtures(directory: Path = FIXTURES) -> List[Fixture]:
+    """
+    Parse every fixture once, encoding the bodies up front so replaying one
+    costs no more than writing the bytes.
+    """
+    fixtures = []
+    for path in sorted(directory.glob("*.json")):
+        fixture = json.loads(path.read_text())
+        body = fixture["body"]
+        repeat = fixture.get("repeat")
+        if repeat and body.get("results"):
+            rows = list(itertools.islice(itertools.cycle(body["results"]), repeat))
+            body = {**body, "results": rows, "resultsCount": len(rows)}
+            if "count" in body:
+                body["count"] = len(rows)
+        fixtures.append(
+            (
+                _route_pattern(fixture["route"]),
+                fixture.get("status", 200),
+                json.dumps(body).encode("utf-8"),
+            )
+        )
+    # Literal routes, e.g. recorded ones, win over templates.
+    fixtures.sort(key=lambda f: f[0].pattern.count("[^/]+"))
+    return fixtures
+
+
+class MockPolygon:
+    def __init__(
+        self,
+        fixtures: List[Fixture],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_429: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.rate_limited = 0
+
+    async def handle(self, request: Request) -> Response:
+        if request.url.path == "/_stats":
+            return JSONResponse(
+                {"requests": self.requests, "rate_limited": self.rate_limited}
+            )
+        self.requests += 1
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.rate_429 and self.random.random() < self.rate_429:
+            self.rate_limited += 1
+            return JSONResponse(
+                {
+                    "status": "ERROR",
+                    "request_id": "mock",
+                    "error": "You've exceeded the maximum requests per minute.",
+                },
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+        for pattern, status, body in self.fixtures:
+            if pattern.match(request.url.path):
+                return Response(body, status, media_type="application/json")
+        return JSONResponse(
+            {"status": "NOT_FOUND", "request_id": "mock", "message": "No fixture."},
+            status_code=404,
+        )
+
+
+class Recorder:
+    """
+    Proxy to Polygon that saves each response as a fixture.
+    """
+
+    def __init__(self, upstream: str, api_key: str, directory: Path = FIXTURES):
+        self.upstream = upstream.rstrip("/")
+        self.directory = directory
+        self.http = urllib3.PoolManager(headers={"Authorization": f"Bearer {api_key}"})
+
+    async def handle(self, request: Request) -> Response:
+        url = self.upstream + request.url.path
+        if request.url.query:
+            url += "?" + request.url.query
+        response = await asyncio.to_thread(self.http.request, request.method, url)
+        if request.method == "GET":
+            self.save(request.url.path, response.status, response.data)
+        return Response(response.data, response.status, media_type="application/json")
+
+    def save(self, path: str, status: int, data: bytes) -> None:
+        try:
+            body: Any = json.loads(data)
+        except ValueError:
+            return
+        name = "recorded" + re.sub(r"[^A-Za-z0-9]+", "_", path)
+        fixture: Dict[str, Any] = {"route": path, "status": status, "body": body}
+        (self.directory / f"{name}.json").write_text(json.dumps(fixture, indent=2))
+
+
+def make_app(handler: Any) -> Starlette:
+    return Starlette(
+        routes=[Route("/{path:path}", handler.handle, methods=["GET", "HEAD"])]
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock Polygon REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES)
+    parser.add_argument("--latency", type=float, default=0, help="ms per request")
+    parser.add_argument("--jitter", type=float, default=0, help="extra random ms")
+    parser.add_argument(
+        "--rate-429", type=float, default=0, help="share of requests rate limited"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--record", action="store_true", help="proxy to Polygon and save fixtures"
+    )
+    parser.add_argument("--upstream", default="https://api.polygon.io")
+    args = parser.parse_args()
+
+    if args.record:
+        handler: Any = Recorder(
+            args.upstream, os.environ.get("POLYGON_API_KEY", ""), args.fixtures
+        )
+    else:
+        handler = MockPolygon(
+            load_fixtures(args.fixtures),
+            latency=args.latency / 1000,
+            jitter=args.jitter / 1000,
+            rate_429=args.rate_429,
+            seed=args.seed,
+        )
+    uvicorn.run(make_app(handler), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
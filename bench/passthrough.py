@@ -0,0 +1,132 @@
+"""
+CPU cost per MB of turning a Polygon response body into a tools/call result.
+
+Compares the old path, where the body was decoded, parsed and re-encoded by
+FastMCP both as text and as structured content, with parsing through the
+fast JSON backend and with passing the body through as text.
+
+    uv run --extra fast python bench/passthrough.py [--rows N] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import CallToolResult
+
+from mcp_polygon.fastjson import loads, orjson
+
+
+def grouped_daily(rows: int) -> bytes:
+    """
+    A get_grouped_daily_aggs response body with ``rows`` tickers.
+    """
+    rng = random.Random(0)
+    results = []
+    for i in range(rows):
+        close = round(rng.uniform(1, 500), 4)
+        results.append(
+            {
+                "T": f"T{i:05d}",
+                "v": rng.randint(1_000, 50_000_000),
+                "vw": round(close * rng.uniform(0.98, 1.02), 4),
+                "o": round(close * rng.uniform(0.95, 1.05), 4),
+                "c": close,
+                "h": round(close * 1.05, 4),
+                "l": round(close * 0.95, 4),
+                "t": 1_700_000_000_000,
+                "n": rng.randint(10, 500_000),
+            }
+        )
+    response = {
+        "queryCount": rows,
+        "resultsCount": rows,
+        "adjusted": True,
+        "results": results,
+        "status": "OK",
+        "request_id": "6a7e466379af0a71039d60cc78e72282",
+        "count": rows,
+    }
+    return json.dumps(response).encode("utf-8")
+
+
+def make_server(body: bytes) -> FastMCP:
+    server = FastMCP("bench")
+
+    @server.tool(structured_output=True)
+    async def parsed_structured() -> Dict[str, Any]:
+        return json.loads(body.decode("utf-8"))
+
+    @server.tool(structured_output=False)
+    async def parsed_stdlib() -> Dict[str, Any]:
+        return json.loads(body)
+
+    @server.tool(structured_output=False)
+    async def parsed_fast() -> Dict[str, Any]:
+        return loads(body)
+
+    @server.tool(structured_output=False)
+    async def passthrough() -> str:
+        return body.decode("utf-8")
+
+    return server
+
+
+async def call(server: FastMCP, name: str) -> str:
+    # What the low-level server does with a tool's return value before it is
+    # written to the transport.
+    result = await server.call_tool(name, {})
+    if isinstance(result, tuple):
+        content, structured = result
+    else:
+        content, structured = list(result), None
+    return CallToolResult(
+        content=content, structuredContent=structured, isError=False
+    ).model_dump_json(by_alias=True, exclude_none=True)
+
+
+def measure(run: Callable[[], Any], repeat: int) -> Tuple[float, int]:
+    run()
+    start = time.process_time()
+    for _ in range(repeat):
+        size = len(run())
+    return (time.process_time() - start) / repeat, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=12_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    body = grouped_daily(args.rows)
+    server = make_server(body)
+    loop = asyncio.new_event_loop()
+    mb = len(body) / 1e6
+    print(f"body: {mb:.2f} MB, {args.rows} rows, orjson: {orjson is not None}")
+
+    paths: List[Tuple[str, str]] = [
+        ("decode + json.loads, text + structured (old)", "parsed_structured"),
+        ("json.loads, text only", "parsed_stdlib"),
+        ("fastjson.loads, text only", "parsed_fast"),
+        ("pass-through", "passthrough"),
+    ]
+    baseline = None
+    print(f"{'path':<46} {'CPU ms/MB':>10} {'reply MB':>9} {'speedup':>8}")
+    for label, name in paths:
+        seconds, size = measure(
+            lambda: loop.run_until_complete(call(server, name)), args.repeat
+        )
+        per_mb = seconds * 1000 / mb
+        baseline = baseline or per_mb
+        print(
+            f"{label:<46} {per_mb:>10.1f} {size / 1e6:>9.2f} {baseline / per_mb:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,465 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlencode
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from mcp_polygon.fastjson import dumps, loads
+from mcp_polygon.polygonClient import POLYGON_BASE_URL
+from mcp_polygon.upstream import fetch, fetch_next, run_blocking
+
+# Path of the SQLite file holding historical bars, or ":memory:" to keep them
+# in memory. Without it aggregates requests go straight to Polygon; point it at
+# a persistent volume to keep bars across restarts.
+POLYGON_AGG_CACHE_PATH = os.environ.get("POLYGON_AGG_CACHE_PATH", "")
+# Upper bound on the stored bar JSON, oldest partitions are evicted first. 0
+# means unbounded, which is the default for on-disk stores.
+POLYGON_AGG_CACHE_MAX_BYTES = int(
+    os.environ.get(
+        "POLYGON_AGG_CACHE_MAX_BYTES",
+        str(64 * 1024 * 1024) if POLYGON_AGG_CACHE_PATH == ":memory:" else "0",
+    )
+)
+# Adjusted bars are rewritten by Polygon after a split, so they are refetched
+# once they are older than this many seconds. Unadjusted bars never expire.
+POLYGON_AGG_ADJUSTED_TTL = float(
+    os.environ.get("POLYGON_AGG_ADJUSTED_TTL", str(24 * 60 * 60))
+)
+
+# Polygon caps a single aggregates request at 50,000 base aggregates, and
+# returns 5,000 bars when no limit is given.
+MAX_BARS_PER_REQUEST = 50000
+DEFAULT_LIMIT = 5000
+# A day is only cached once it ended at least this long ago, leaving time for
+# late corrections.
+SETTLE_TIME = timedelta(hours=12)
+# Bars per day at multiplier 1 for the timespans that can be partitioned by
+# day. Coarser timespans have bars spanning several days.
+_BARS_PER_DAY = {"minute": 24 * 60, "hour": 24, "day": 1}
+# Base aggregates per day counted towards MAX_BARS_PER_REQUEST. Hour bars are
+# built from minute bars.
+_BASE_BARS_PER_DAY = {"minute": 24 * 60, "hour": 24 * 60, "day": 1}
+
+try:
+    _EASTERN: Optional[tzinfo] = ZoneInfo("America/New_York")
+except ZoneInfoNotFoundError:
+    _EASTERN = None
+
+Series = Tuple[str, int, str, bool]
+
+
+def _series_timezone(ticker: str) -> Optional[tzinfo]:
+    # Polygon uses UTC days for crypto and forex and Eastern days otherwise.
+    if ticker.startswith(("X:", "C:")):
+        return timezone.utc
+    return _EASTERN
+
+
+def _as_day(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return None
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _day_bounds(day: date, tz: tzinfo) -> Tuple[int, int]:
+    start = datetime.combine(day, datetime.min.time(), tz)
+    end = datetime.combine(day + timedelta(days=1), datetime.min.time(), tz)
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000) - 1
+
+
+def _runs(days: List[date], max_days: int) -> List[Tuple[date, date]]:
+    """
+    Group sorted days into contiguous runs of at most ``max_days`` days.
+    """
+    runs: List[Tuple[date, date]] = []
+    for day in days:
+        if (
+            runs
+            and runs[-1][1] + timedelta(days=1) == day
+            and (day - runs[-1][0]).days < max_days
+        ):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+class IntervalSet:
+    """
+    Sorted set of disjoint, inclusive integer intervals. Adjacent intervals
+    are merged, so ``[1, 3]`` and ``[4, 6]`` are stored as ``[1, 6]``.
+    """
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def add(self, start: int, end: int) -> None:
+        lo = bisect_left(self._ends, start - 1)
+        hi = bisect_right(self._starts, end + 1)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def discard(self, point: int) -> None:
+        i = bisect_right(self._starts, point) - 1
+        if i < 0 or self._ends[i] < point:
+            return
+        start, end = self._starts[i], self._ends[i]
+        pieces = [(a, b) for a, b in ((start, point - 1), (point + 1, end)) if a <= b]
+        self._starts[i : i + 1] = [a for a, _ in pieces]
+        self._ends[i : i + 1] = [b for _, b in pieces]
+
+    def intersection(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """
+        Return the parts of ``[start, end]`` covered by the set.
+        """
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        return [
+            (max(start, self._starts[i]), min(end, self._ends[i]))
+            for i in range(lo, hi)
+        ]
+
+
+class AggregateStore:
+    """
+    SQLite store of aggregate bars partitioned by ticker, multiplier,
+    timespan, adjustment and day.
+
+    An empty partition records a day that was fetched and had no bars, so
+    weekends and holidays are not requested again. The days held for each
+    series are indexed in memory, so lookups for ranges that were never
+    fetched don't touch the database.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self._index: Dict[Series, IntervalSet] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS partitions (
+                    ticker TEXT NOT NULL,
+                    multiplier INTEGER NOT NULL,
+                    timespan TEXT NOT NULL,
+                    adjusted INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    bars BLOB NOT NULL,
+                    PRIMARY KEY (ticker, multiplier, timespan, adjusted, day)
+                ) WITHOUT ROWID
+                """
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS partitions_fetched_at "
+                "ON partitions (fetched_at)"
+            )
+
+    def _coverage(self, series: Series) -> IntervalSet:
+        # Callers hold self._lock.
+        coverage = self._index.get(series)
+        if coverage is None:
+            coverage = self._index[series] = IntervalSet()
+            for (day,) in self._db.execute(
+                """
+                SELECT day FROM partitions
+                WHERE ticker = ? AND multiplier = ? AND timespan = ? AND adjusted = ?
+                """,
+                series,
+            ):
+                ordinal = date.fromisoformat(day).toordinal()
+                coverage.add(ordinal, ordinal)
+        return coverage
+
+    def load(
+        self, series: Series, first: date, last: date
+    ) -> Dict[date, List[Dict[str, Any]]]:
+        """
+        Return the stored partitions of ``series`` between two days, skipping
+        adjusted partitions that have expired.
+        """
+        ticker, multiplier, timespan, adjusted = series
+        oldest = time.time() - POLYGON_AGG_ADJUSTED_TTL if adjusted else 0.0
+        with self._lock:
+            covered = self._coverage(series).intersection(
+                first.toordinal(), last.toordinal()
+            )
+            if not covered:
+                return {}
+            first = date.fromordinal(covered[0][0])
+            last = date.fromordinal(covered[-1][1])
+            rows = self._db.execute(
+                """
+                SELECT day, bars FROM partitions
+                WHERE ticker = ? AND multiplier = ? AND timespan = ?
+                    AND adjusted = ? AND day BETWEEN ? AND ? AND fetched_at >= ?
+                """,
+                (
+                    ticker,
+                    multiplier,
+                    timespan,
+                    adjusted,
+                    first.isoformat(),
+                    last.isoformat(),
+                    oldest,
+                ),
+            ).fetchall()
+        return {date.fromisoformat(day): loads(bars) for day, bars in rows}
+
+    def save(
+        self, series: Series, partitions: Dict[date, List[Dict[str, Any]]]
+    ) -> None:
+        fetched_at = time.time()
+        rows = [
+            (*series, day.isoformat(), fetched_at, dumps(bars))
+            for day, bars in partitions.items()
+        ]
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO partitions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            coverage = self._coverage(series)
+            for day in partitions:
+                coverage.add(day.toordinal(), day.toordinal())
+            if self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # Callers hold self._lock inside a transaction.
+        (size,) = self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(bars)), 0) FROM partitions"
+        ).fetchone()
+        while size > self.max_bytes:
+            victims = []
+            for row in self._db.execute(
+                """
+                SELECT ticker, multiplier, timespan, adjusted, day, LENGTH(bars)
+                FROM partitions ORDER BY fetched_at LIMIT 64
+                """
+            ).fetchall():
+                if size <= self.max_bytes:
+                    break
+                victims.append(row)
+                size -= row[5]
+            if not victims:
+                break
+            self._db.executemany(
+                """
+                DELETE FROM partitions WHERE ticker = ? AND multiplier = ?
+                    AND timespan = ? AND adjusted = ? AND day = ?
+                """,
+                [victim[:5] for victim in victims],
+            )
+            for *series, day, _ in victims:
+                coverage = self._index.get(tuple(series))
+                if coverage is not None:
+                    coverage.discard(date.fromisoformat(day).toordinal())
+
+
+aggregate_store: Optional[AggregateStore] = (
+    AggregateStore(POLYGON_AGG_CACHE_PATH, max_bytes=POLYGON_AGG_CACHE_MAX_BYTES)
+    if POLYGON_AGG_CACHE_PATH
+    else None
+)
+
+
+async def fetch_aggs(
+    method: str,
+    /,
+    *,
+    ticker: str,
+    multiplier: int,
+    timespan: str,
+    from_: Union[str, int, datetime, date],
+    to: Union[str, int, datetime, date],
+    adjusted: Optional[bool] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch aggregate bars, serving settled days from ``aggregate_store`` and
+    requesting only the days that are missing from it. Overlapping requests
+    for the same series therefore only fetch the gaps, and the result is
+    stitched together from stored and fresh partitions. As with Polygon, at
+    most ``limit`` bars are returned, 5,000 by default, with a ``next_url``
+    to resume from when there are more; only the days needed to fill the
+    limit are fetched.
+
+    Without a store, and for requests it can't partition by day (timestamps
+    instead of dates, multi-day timespans, extra ``params``), the request
+    goes straight to ``method``.
+
+    A stitched response keeps the fields of Polygon's. ``queryCount`` is the
+    sum over the requests made plus the bars read from the store, and
+    ``request_id`` is that of the last request, absent when every day came
+    from the store. ``agg_cache`` tells how many of the days were stored.
+    """
+    first, last = _as_day(from_), _as_day(to)
+    tz = _series_timezone(ticker)
+    bars_per_day = _BARS_PER_DAY.get(timespan, 0)
+    if (
+        aggregate_store is None
+        or params
+        or first is None
+        or last is None
+        or first > last
+        or tz is None
+        or not bars_per_day
+        or multiplier <= 0
+        or bars_per_day % multiplier
+    ):
+        return await fetch(
+            method,
+            ticker=ticker,
+            multiplier=multiplier,
+            timespan=timespan,
+            from_=from_,
+            to=to,
+            adjusted=adjusted,
+            sort=sort,
+            limit=limit,
+            params=params,
+        )
+
+    adjusted = True if adjusted is None else adjusted
+    series: Series = (ticker, multiplier, timespan, adjusted)
+    settled = datetime.now(tz) - SETTLE_TIME
+    days = [first + timedelta(days=i) for i in range((last - first).days + 1)]
+    # Days in the order their bars are returned.
+    ordered = days[::-1] if sort == "desc" else days
+    want = limit or DEFAULT_LIMIT
+    bars_per_bucket = bars_per_day // multiplier
+    max_days = max(1, MAX_BARS_PER_REQUEST // _BASE_BARS_PER_DAY[timespan])
+
+    partitions = await run_blocking(aggregate_store.load, series, first, last)
+
+    async def fetch_run(run: Tuple[date, date]) -> Dict[str, Any]:
+        response = await fetch(
+            method,
+            ticker=ticker,
+            multiplier=multiplier,
+            timespan=timespan,
+            from_=_day_bounds(run[0], tz)[0],
+            to=_day_bounds(run[1], tz)[1],
+            adjusted=adjusted,
+            sort="asc",
+            limit=MAX_BARS_PER_REQUEST,
+        )
+        run_response = {**response, "results": list(response.get("results") or [])}
+        # A run Polygon cut short is followed to its end, so no day is kept
+        # with only part of its bars.
+        next_url, page = response.get("next_url"), 1
+        while next_url:
+            page += 1
+            response = await fetch_next(next_url, method, page)
+            run_response["results"].extend(response.get("results") or [])
+            run_response["queryCount"] = run_response.get(
+                "queryCount", 0
+            ) + response.get("queryCount", 0)
+            next_url = response.get("next_url")
+        return run_response
+
+    # Days are fetched in rounds, each covering the missing days expected to
+    # fill the limit, so a small limit doesn't fetch the whole range.
+    fetched: Dict[date, List[Dict[str, Any]]] = {}
+    responses: List[Dict[str, Any]] = []
+    covered = 0
+    have = 0
+    while covered < len(ordered) and have < want:
+        end, estimate, missing = covered, have, []
+        while end < len(ordered) and estimate < want:
+            day = ordered[end]
+            if day in partitions:
+                estimate += len(partitions[day])
+            else:
+                missing.append(day)
+                estimate += bars_per_bucket
+            end += 1
+        fresh = await asyncio.gather(
+            *(fetch_run(run) for run in _runs(sorted(missing), max_days))
+        )
+        responses.extend(fresh)
+        bars_by_day: Dict[date, List[Dict[str, Any]]] = {day: [] for day in missing}
+        for response in fresh:
+            for bar in response["results"]:
+                day = datetime.fromtimestamp(bar["t"] / 1000, tz).date()
+                if day in bars_by_day:
+                    bars_by_day[day].append(bar)
+        fetched.update(bars_by_day)
+        partitions.update(bars_by_day)
+        have += sum(len(partitions[day]) for day in ordered[covered:end])
+        covered = end
+
+    settled_days = {
+        day: bars
+        for day, bars in fetched.items()
+        if datetime.combine(day + timedelta(days=1), datetime.min.time(), tz) <= settled
+    }
+    if settled_days:
+        await run_blocking(aggregate_store.save, series, settled_days)
+
+    results = [bar for day in sorted(ordered[:covered]) for bar in partitions[day]]
+    if sort == "desc":
+        results.reverse()
+    next_url = None
+    if len(results) > want or covered < len(ordered):
+        # Resume after the last bar returned, the way Polygon's cursor does.
+        edge = results[want - 1]["t"]
+        if sort == "desc":
+            bounds = (_day_bounds(first, tz)[0], edge - 1)
+        else:
+            bounds = (edge + 1, _day_bounds(last, tz)[1])
+        query = urlencode(
+            {"adjusted": str(adjusted).lower(), "sort": sort or "asc", "limit": want}
+        )
+        next_url = (
+            f"{POLYGON_BASE_URL}/v2/aggs/ticker/{ticker}/range/{multiplier}/"
+            f"{timespan}/{bounds[0]}/{bounds[1]}?{query}"
+        )
+    results = results[:want]
+
+    stored = [day for day in ordered[:covered] if day not in fetched]
+    status = "OK"
+    if any(response.get("status") == "DELAYED" for response in responses):
+        status = "DELAYED"
+    query_count = sum(len(partitions[day]) for day in stored) + sum(
+        response.get("queryCount", 0) for response in responses
+    )
+    stitched: Dict[str, Any] = {
+        "ticker": ticker,
+        "queryCount": query_count,
+        "resultsCount": len(results),
+        "adjusted": adjusted,
+        "results": results,
+        "status": status,
+    }
+    request_ids = [r["request_id"] for r in responses if r.get("request_id")]
+    if request_ids:
+        stitched["request_id"] = request_ids[-1]
+    stitched["count"] = len(results)
+    if next_url:
+        stitched["next_url"] = next_url
+    stitched["agg_cache"] = {"days": covered, "stored_days": len(stored)}
+    return stitched
@@ -0,0 +1,98 @@
+import asyncio
+import os
+from typing import Any, Dict, List
+
+from mcp_polygon.upstream import fetch
+
+# Most per-ticker requests a single batch tool call runs at once.
+POLYGON_BATCH_CONCURRENCY = int(os.environ.get("POLYGON_BATCH_CONCURRENCY", "8"))
+
+# Snapshot field holding the row each batch method returns per ticker.
+SNAPSHOT_FIELDS = {
+    "get_previous_close_agg": "prevDay",
+    "get_last_trade": "lastTrade",
+    "get_last_quote": "lastQuote",
+}
+
+
+def _merged(rows: List[Dict[str, Any]], errors: Dict[str, str]) -> Dict[str, Any]:
+    merged: Dict[str, Any] = {
+        "status": "OK",
+        "results": rows,
+        "resultsCount": len(rows),
+    }
+    if errors:
+        merged["errors"] = errors
+    return merged
+
+
+async def fetch_batch(
+    method: str, tickers: List[str], /, **kwargs: Any
+) -> Dict[str, Any]:
+    """
+    Call ``polygon_client.<method>`` once per ticker, at most
+    ``POLYGON_BATCH_CONCURRENCY`` at a time, and merge the ``results`` of
+    every response into one list. Tickers that failed or returned nothing
+    are listed under ``errors`` instead of failing the whole batch.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    semaphore = asyncio.Semaphore(max(1, POLYGON_BATCH_CONCURRENCY))
+
+    async def one(ticker: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await fetch(method, ticker=ticker, **kwargs)
+
+    responses = await asyncio.gather(
+        *(one(ticker) for ticker in tickers), return_exceptions=True
+    )
+
+    rows: List[Dict[str, Any]] = []
+    errors: Dict[str, str] = {}
+    for ticker, response in zip(tickers, responses):
+        if isinstance(response, Exception):
+            errors[ticker] = str(response)
+            continue
+        results = response.get("results")
+        if isinstance(results, dict):
+            results = [results]
+        if not results:
+            errors[ticker] = response.get("error") or "No results"
+            continue
+        rows.extend({"T": ticker, **row} for row in results)
+    return _merged(rows, errors)
+
+
+async def fetch_batch_snapshot(
+    method: str, tickers: List[str], /, **kwargs: Any
+) -> Dict[str, Any]:
+    """
+    Answer a batch of ``method`` calls for stock tickers from a single
+    ``get_snapshot_all`` request. Rows carry the snapshot's fields, which
+    are fewer than the per-ticker endpoints return.
+
+    The snapshot endpoint takes none of the per-ticker endpoints' options,
+    so any ``kwargs`` that are set raise ValueError rather than being
+    silently dropped.
+    """
+    ignored = sorted(name for name, value in kwargs.items() if value is not None)
+    if ignored:
+        raise ValueError(f"use_snapshot can't be combined with {', '.join(ignored)}")
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        # An empty tickers filter would fetch the whole market.
+        return _merged([], {})
+    field = SNAPSHOT_FIELDS[method]
+    response = await fetch("get_snapshot_all", market_type="stocks", tickers=tickers)
+    snapshots = {
+        snapshot.get("ticker"): snapshot for snapshot in response.get("tickers") or []
+    }
+
+    rows: List[Dict[str, Any]] = []
+    errors: Dict[str, str] = {}
+    for ticker in tickers:
+        row = (snapshots.get(ticker) or {}).get(field)
+        if row:
+            rows.append({"T": ticker, **row})
+        else:
+            errors[ticker] = "No results"
+    return _merged(rows, errors)
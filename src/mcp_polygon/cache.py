@@ -0,0 +1,83 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Seconds to keep responses of slow-changing reference endpoints, keyed by
+# polygon_client method name. Methods not listed here are never cached.
+CACHE_TTLS: Dict[str, float] = {
+    "get_exchanges": 24 * 60 * 60,
+    "get_ticker_types": 24 * 60 * 60,
+    "list_conditions": 24 * 60 * 60,
+    "get_market_holidays": 60 * 60,
+    "get_ticker_details": 60 * 60,
+}
+
+
+def make_key(method: str, kwargs: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Build a cache key from a method name and its arguments, ignoring
+    arguments left at ``None`` so equivalent calls share one entry.
+    """
+    args = {k: v for k, v in kwargs.items() if v is not None and v != {}}
+    return method, json.dumps(args, sort_keys=True, default=str)
+
+
+class TTLCache:
+    """
+    In-process LRU cache with per-entry expiry and a cap on the total size
+    of the cached values.
+
+    Cached values are shared between callers and must not be mutated. The
+    cache is not thread-safe; use it from the event loop only.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires, _, value = entry
+        if expires <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float, size: int) -> None:
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
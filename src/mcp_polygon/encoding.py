@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Optional
+
+# Integer timestamp fields that are sent as deltas from the previous row.
+TIMESTAMP_KEYS = (
+    "t",
+    "sip_timestamp",
+    "participant_timestamp",
+    "trf_timestamp",
+    "window_start",
+)
+
+
+def _delta_encode(values: List[Any]) -> Optional[List[int]]:
+    if not all(type(value) is int for value in values):
+        return None
+    return values[:1] + [b - a for a, b in zip(values, values[1:])]
+
+
+def to_columnar(
+    response: Dict[str, Any], precision: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Re-encode the ``results`` rows of a response as one array per field.
+
+    Integer timestamp columns are delta-encoded: the first value is absolute
+    and every following value is the difference to the previous row, so
+    ``t[i] = sum(t[:i + 1])``. Fields missing from a row are ``null``. With
+    ``precision`` set, floats are rounded to that many decimals.
+    """
+    rows = response.get("results") or []
+    keys: Dict[str, None] = {}
+    for row in rows:
+        keys.update(dict.fromkeys(row))
+
+    columns: Dict[str, List[Any]] = {}
+    delta: List[str] = []
+    for key in keys:
+        values = [row.get(key) for row in rows]
+        if key in TIMESTAMP_KEYS:
+            encoded = _delta_encode(values)
+            if encoded is not None:
+                values = encoded
+                delta.append(key)
+        elif precision is not None:
+            values = [
+                round(value, precision) if type(value) is float else value
+                for value in values
+            ]
+        columns[key] = values
+
+    compact = {k: v for k, v in response.items() if k != "results"}
+    compact.update(format="columnar", columns=columns, delta_encoded=delta)
+    return compact
@@ -0,0 +1,24 @@
+from typing import Any
+
+# orjson parses several times faster than the standard library and parses
+# bytes directly. json.loads also takes bytes, but decodes them to a str
+# first, so large bodies briefly exist twice. orjson is optional
+# (pip install "mcp_polygon[fast]").
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str)
+
+else:
+    import json
+
+    loads = json.loads
+
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), default=str).encode("utf-8")
@@ -0,0 +1,211 @@
+import math
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _EASTERN: Optional[ZoneInfo] = ZoneInfo("America/New_York")
+except Exception:
+    _EASTERN = None
+
+# Annualized, continuously compounded rates used when pricing locally.
+POLYGON_RISK_FREE_RATE = float(os.environ.get("POLYGON_RISK_FREE_RATE", "0.04"))
+POLYGON_DIVIDEND_YIELD = float(os.environ.get("POLYGON_DIVIDEND_YIELD", "0"))
+
+SECONDS_PER_YEAR = 365 * 24 * 60 * 60
+# Implied volatilities are searched for in this range.
+MIN_VOL, MAX_VOL = 1e-4, 5.0
+
+_erf = np.frompyfunc(math.erf, 1, 1)
+
+
+def norm_cdf(x: np.ndarray) -> np.ndarray:
+    # frompyfunc returns a bare float rather than an array for scalars.
+    erf = _erf(np.asarray(x, dtype=np.float64) / math.sqrt(2))
+    return 0.5 * (1 + np.asarray(erf, dtype=np.float64))
+
+
+def norm_pdf(x: np.ndarray) -> np.ndarray:
+    return np.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
+
+
+def _d1_d2(s, k, t, r, q, vol):
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(s / k) + (r - q + 0.5 * vol * vol) * t) / (vol * sqrt_t)
+    return d1, d1 - vol * sqrt_t
+
+
+def bs_price(s, k, t, r, q, vol, is_call) -> np.ndarray:
+    """
+    Black-Scholes-Merton price of European options. All arguments may be
+    arrays and broadcast together; ``t`` is in years.
+    """
+    d1, d2 = _d1_d2(s, k, t, r, q, vol)
+    spot, strike = s * np.exp(-q * t), k * np.exp(-r * t)
+    call = spot * norm_cdf(d1) - strike * norm_cdf(d2)
+    put = strike * norm_cdf(-d2) - spot * norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def implied_volatility(
+    price, s, k, t, r, q, is_call, tol: float = 1e-8, max_iter: int = 100
+) -> np.ndarray:
+    """
+    Volatility that reproduces ``price``, solved for all contracts at once
+    with Newton steps safeguarded by bisection, which keeps convergence
+    for deep in- or out-of-the-money contracts where vega vanishes. NaN
+    where the price is outside the no-arbitrage bounds.
+    """
+    price, s, k, t, is_call = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (price, s, k, t, is_call))
+    )
+    is_call = is_call.astype(bool)
+    spot, strike = s * np.exp(-q * t), k * np.exp(-r * t)
+    lower = np.where(
+        is_call, np.maximum(spot - strike, 0), np.maximum(strike - spot, 0)
+    )
+    upper = np.where(is_call, spot, strike)
+    valid = (price > lower) & (price < upper) & (t > 0)
+
+    lo = np.full(price.shape, MIN_VOL)
+    hi = np.full(price.shape, MAX_VOL)
+    vol = np.full(price.shape, 0.3)
+    active = valid.copy()
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        p, sv, kv, tv, cv = (a[active] for a in (price, s, k, t, is_call))
+        v = vol[active]
+        diff = bs_price(sv, kv, tv, r, q, v, cv) - p
+        d1, _ = _d1_d2(sv, kv, tv, r, q, v)
+        vega = sv * np.exp(-q * tv) * norm_pdf(d1) * np.sqrt(tv)
+
+        # Price rises with volatility, so the sign of diff brackets the root.
+        lo[active] = np.where(diff < 0, v, lo[active])
+        hi[active] = np.where(diff > 0, v, hi[active])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = v - diff / vega
+        bisect = ~((step > lo[active]) & (step < hi[active]))
+        vol[active] = np.where(bisect, 0.5 * (lo[active] + hi[active]), step)
+
+        done = np.abs(diff) < tol
+        indices = np.flatnonzero(active)
+        vol[indices[done]] = v[done]
+        active[indices[done]] = False
+    return np.where(valid, vol, np.nan)
+
+
+def greeks(s, k, t, r, q, vol, is_call) -> Dict[str, np.ndarray]:
+    """
+    Delta, gamma, theta and vega in Polygon's units: theta per calendar
+    day and vega per volatility point.
+    """
+    d1, d2 = _d1_d2(s, k, t, r, q, vol)
+    sqrt_t = np.sqrt(t)
+    carry, discount = np.exp(-q * t), np.exp(-r * t)
+    pdf = norm_pdf(d1)
+
+    delta = np.where(is_call, carry * norm_cdf(d1), carry * (norm_cdf(d1) - 1))
+    gamma = carry * pdf / (s * vol * sqrt_t)
+    vega = s * carry * pdf * sqrt_t
+    decay = -s * carry * pdf * vol / (2 * sqrt_t)
+    call_theta = decay - r * k * discount * norm_cdf(d2) + q * s * carry * norm_cdf(d1)
+    put_theta = decay + r * k * discount * norm_cdf(-d2) - q * s * carry * norm_cdf(-d1)
+    theta = np.where(is_call, call_theta, put_theta)
+    return {"delta": delta, "gamma": gamma, "theta": theta / 365, "vega": vega / 100}
+
+
+def years_to_expiry(expiration_date: str, now: Optional[float] = None) -> float:
+    """
+    Years from ``now`` until the 4pm Eastern close on the expiration date.
+    """
+    expiry = datetime.fromisoformat(expiration_date).replace(hour=16, tzinfo=_EASTERN)
+    now = time.time() if now is None else now
+    return (expiry.timestamp() - now) / SECONDS_PER_YEAR
+
+
+def _mid(contract: Dict[str, Any]) -> Optional[float]:
+    quote = contract.get("last_quote") or {}
+    if quote.get("midpoint"):
+        return quote["midpoint"]
+    if quote.get("bid") and quote.get("ask"):
+        return (quote["bid"] + quote["ask"]) / 2
+    return (contract.get("day") or {}).get("close") or None
+
+
+def fill_greeks(
+    contracts: List[Dict[str, Any]],
+    rate: float = POLYGON_RISK_FREE_RATE,
+    dividend_yield: float = POLYGON_DIVIDEND_YIELD,
+) -> List[Dict[str, Any]]:
+    """
+    Compute implied volatility and greeks for option snapshot contracts that
+    Polygon returned without them, from the underlying price, strike,
+    expiry and quote midpoint.
+
+    Returns a new list; filled contracts are copies marked with
+    ``greeks_source: "local"`` and the others are passed through untouched.
+    """
+    missing, inputs = [], []
+    now = time.time()
+    for i, contract in enumerate(contracts):
+        if contract.get("greeks") and contract.get("implied_volatility"):
+            continue
+        details = contract.get("details") or {}
+        spot = (contract.get("underlying_asset") or {}).get("price")
+        price = _mid(contract)
+        if not (spot and price and details.get("strike_price")):
+            continue
+        if not details.get("expiration_date"):
+            continue
+        missing.append(i)
+        inputs.append(
+            (
+                price,
+                spot,
+                details["strike_price"],
+                years_to_expiry(details["expiration_date"], now),
+                details.get("contract_type") == "call",
+            )
+        )
+    if not missing:
+        return contracts
+
+    price, s, k, t, is_call = (np.array(column) for column in zip(*inputs))
+    is_call = is_call.astype(bool)
+    vol = implied_volatility(price, s, k, t, rate, dividend_yield, is_call)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = greeks(s, k, t, rate, dividend_yield, vol, is_call)
+
+    filled = list(contracts)
+    for n, i in enumerate(missing):
+        if np.isnan(vol[n]):
+            continue
+        contract = dict(contracts[i])
+        contract["implied_volatility"] = float(vol[n])
+        contract["greeks"] = {name: float(values[name][n]) for name in values}
+        contract["greeks_source"] = "local"
+        filled[i] = contract
+    return filled
+
+
+def fill_response_greeks(response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply ``fill_greeks`` to the contract or contracts of an option snapshot
+    response, returning a copy if anything was filled in.
+    """
+    results = response.get("results")
+    if isinstance(results, dict):
+        filled = fill_greeks([results])[0]
+        return response if filled is results else {**response, "results": filled}
+    if isinstance(results, list):
+        filled_list = fill_greeks(results)
+        return (
+            response if filled_list is results else {**response, "results": filled_list}
+        )
+    return response
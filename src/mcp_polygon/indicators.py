@@ -0,0 +1,210 @@
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _EASTERN: Optional[ZoneInfo] = ZoneInfo("America/New_York")
+except Exception:
+    _EASTERN = None
+
+# Indicator name -> default parameters. Requests are written as
+# "name" or "name:p1,p2", e.g. "sma:50" or "macd:12,26,9".
+DEFAULT_PARAMETERS: Dict[str, Tuple[float, ...]] = {
+    "sma": (20,),
+    "ema": (20,),
+    "rsi": (14,),
+    "macd": (12, 26, 9),
+    "bollinger": (20, 2),
+    "atr": (14,),
+    "vwap": (),
+}
+
+# Timespans whose VWAP restarts every trading day.
+_INTRADAY = ("second", "minute", "hour")
+
+
+def _column(bars: List[Dict[str, Any]], key: str) -> np.ndarray:
+    return np.fromiter(
+        (bar.get(key, np.nan) for bar in bars), dtype=np.float64, count=len(bars)
+    )
+
+
+def sma(values: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        sums = np.cumsum(np.insert(values, 0, 0.0))
+        out[window - 1 :] = (sums[window:] - sums[:-window]) / window
+    return out
+
+
+def ema(values: np.ndarray, window: int, alpha: Optional[float] = None) -> np.ndarray:
+    """
+    Exponential moving average seeded with the simple average of the first
+    ``window`` values. Leading NaNs are skipped. ``alpha`` defaults to
+    ``2 / (window + 1)``; Wilder's smoothing uses ``1 / window``.
+    """
+    alpha = 2 / (window + 1) if alpha is None else alpha
+    out = np.full(len(values), np.nan)
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) < window:
+        return out
+    start = valid[0] + window - 1
+    # Each value depends on the previous one, so this recurrence is a loop;
+    # plain floats keep it fast.
+    current = float(values[valid[0] : start + 1].mean())
+    series = [current]
+    for value in values[start + 1 :].tolist():
+        current += alpha * (value - current)
+        series.append(current)
+    out[start:] = series
+    return out
+
+
+def rsi(close: np.ndarray, window: int) -> np.ndarray:
+    change = np.diff(close, prepend=np.nan)
+    gain = np.where(change > 0, change, 0.0)
+    loss = np.where(change < 0, -change, 0.0)
+    # The first bar has no change; NaN makes the averages start after it.
+    gain[:1] = loss[:1] = np.nan
+    gain = ema(gain, window, 1 / window)
+    loss = ema(loss, window, 1 / window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100 - 100 / (1 + gain / loss)
+    return np.where((loss == 0) & ~np.isnan(gain), 100.0, out)
+
+
+def macd(close: np.ndarray, fast: int, slow: int, signal: int) -> Dict[str, np.ndarray]:
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+
+def bollinger(close: np.ndarray, window: int, width: float) -> Dict[str, np.ndarray]:
+    middle = sma(close, window)
+    std = np.full(len(close), np.nan)
+    if len(close) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(close, window)
+        std[window - 1 :] = windows.std(axis=1)
+    return {
+        "middle": middle,
+        "upper": middle + width * std,
+        "lower": middle - width * std,
+    }
+
+
+def atr(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int
+) -> np.ndarray:
+    previous = np.roll(close, 1)
+    true_range = np.maximum(
+        high - low, np.maximum(np.abs(high - previous), np.abs(low - previous))
+    )
+    if len(true_range):
+        true_range[0] = high[0] - low[0]
+    return ema(true_range, window, 1 / window)
+
+
+def vwap(
+    t: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    session: bool,
+) -> np.ndarray:
+    """
+    Volume-weighted typical price, cumulative over the range or, with
+    ``session`` set, restarting with each trading day.
+    """
+    notional = np.cumsum((high + low + close) / 3 * volume)
+    shares = np.cumsum(volume)
+    if session and len(t):
+        days = np.array(
+            [datetime.fromtimestamp(ms / 1000, _EASTERN).date() for ms in t.tolist()]
+        )
+        starts = np.flatnonzero(np.concatenate(([True], days[1:] != days[:-1])))
+        offsets = np.repeat(starts, np.diff(np.append(starts, len(t))))
+        notional -= np.where(offsets > 0, notional[offsets - 1], 0.0)
+        shares -= np.where(offsets > 0, shares[offsets - 1], 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return notional / shares
+
+
+def parse_indicator(spec: str) -> Tuple[str, Tuple[float, ...]]:
+    """
+    Split an indicator request such as ``"bollinger:20,2"`` into its name
+    and parameters, filling in defaults for parameters left out.
+    """
+    name, _, args = spec.strip().lower().partition(":")
+    if name not in DEFAULT_PARAMETERS:
+        raise ValueError(
+            f"Unknown indicator {name!r}; expected one of "
+            f"{', '.join(DEFAULT_PARAMETERS)}"
+        )
+    defaults = DEFAULT_PARAMETERS[name]
+    values = [float(arg) for arg in args.split(",") if arg.strip()]
+    if len(values) > len(defaults):
+        raise ValueError(f"{name} takes at most {len(defaults)} parameter(s)")
+    parameters = tuple(values) + defaults[len(values) :]
+    if any(p <= 0 for p in parameters):
+        raise ValueError(f"{name} parameters must be positive")
+    return name, parameters
+
+
+def _label(name: str, parameters: Tuple[float, ...]) -> str:
+    return "_".join([name] + [f"{p:g}" for p in parameters])
+
+
+def _to_list(values: np.ndarray, precision: Optional[int]) -> List[Optional[float]]:
+    if precision is not None:
+        values = np.round(values, precision)
+    return [None if np.isnan(value) else value for value in values.tolist()]
+
+
+def compute_indicators(
+    bars: List[Dict[str, Any]],
+    indicators: List[str],
+    timespan: str = "day",
+    last: Optional[int] = None,
+    precision: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Compute the requested indicators over ascending aggregate bars.
+
+    Returns the bar timestamps under ``t`` and one series per indicator,
+    keyed like ``sma_20``; multi-line indicators map to a dict of series.
+    Values are ``null`` until an indicator has enough bars. With ``last``
+    set only the final ``last`` points are returned.
+    """
+    requested = [parse_indicator(spec) for spec in indicators]
+    t = np.fromiter((bar["t"] for bar in bars), dtype=np.int64, count=len(bars))
+    high, low, close = (_column(bars, key) for key in ("h", "l", "c"))
+
+    compute: Dict[str, Callable[..., Any]] = {
+        "sma": lambda n: sma(close, int(n)),
+        "ema": lambda n: ema(close, int(n)),
+        "rsi": lambda n: rsi(close, int(n)),
+        "macd": lambda f, s, g: macd(close, int(f), int(s), int(g)),
+        "bollinger": lambda n, k: bollinger(close, int(n), k),
+        "atr": lambda n: atr(high, low, close, int(n)),
+        "vwap": lambda: vwap(
+            t, high, low, close, _column(bars, "v"), timespan in _INTRADAY
+        ),
+    }
+
+    window = slice(-last, None) if last else slice(None)
+    series: Dict[str, Any] = {}
+    for name, parameters in requested:
+        values = compute[name](*parameters)
+        label = _label(name, parameters)
+        if isinstance(values, dict):
+            series[label] = {
+                line: _to_list(points[window], precision)
+                for line, points in values.items()
+            }
+        else:
+            series[label] = _to_list(values[window], precision)
+    return {"t": t[window].tolist(), "indicators": series}
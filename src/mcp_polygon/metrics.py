@@ -0,0 +1,293 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Prometheus text exposition format, as served on /metrics.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# 1 KiB to 64 MiB in powers of 4.
+SIZE_BUCKETS = tuple(1024 * 4**i for i in range(9))
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Labels, float]
+
+# Labels added to every sample, e.g. the worker process serving the scrape.
+const_labels: Labels = ()
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+
+    def samples(self) -> Iterable[Sample]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format(const_labels + labels)} {_number(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self.values: Dict[Labels, float] = defaultdict(float)
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        self.values[_labels(labels)] += amount
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in sorted(self.values.items()):
+            yield self.name, labels, value
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.values[_labels(labels)] -= amount
+
+    def set(self, value: float, **labels: Any) -> None:
+        self.values[_labels(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...]):
+        super().__init__(name, help)
+        self.buckets = buckets
+        # Labels -> per-bucket counts (the last one is +Inf), sum.
+        self.values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        if key not in self.values:
+            self.values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = self.values[key]
+        counts[bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                yield f"{self.name}_bucket", (*labels, ("le", le)), cumulative
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+
+
+tool_calls = Counter("mcp_tool_calls_total", "Tool calls by outcome.")
+tool_errors = Counter(
+    "mcp_tool_errors_total", "Failed tool calls by class of the underlying error."
+)
+tool_in_flight = Gauge("mcp_tool_calls_in_flight", "Tool calls being handled.")
+tool_seconds = Histogram(
+    "mcp_tool_duration_seconds", "Tool call duration.", LATENCY_BUCKETS
+)
+tool_upstream_seconds = Histogram(
+    "mcp_tool_upstream_seconds",
+    "Time a tool call spent waiting on Polygon, overlapping requests counted once.",
+    LATENCY_BUCKETS,
+)
+tool_overhead_seconds = Histogram(
+    "mcp_tool_overhead_seconds",
+    "Tool call duration not spent waiting on Polygon.",
+    LATENCY_BUCKETS,
+)
+tool_response_bytes = Histogram(
+    "mcp_tool_response_bytes", "Size of the tool result text.", SIZE_BUCKETS
+)
+upstream_requests = Counter(
+    "polygon_upstream_requests_total", "Polygon HTTP requests by outcome."
+)
+upstream_in_flight = Gauge(
+    "polygon_upstream_requests_in_flight", "Polygon HTTP requests in progress."
+)
+upstream_seconds = Histogram(
+    "polygon_upstream_request_seconds",
+    "Duration of one Polygon HTTP request, excluding rate limiting.",
+    LATENCY_BUCKETS,
+)
+
+METRICS: List[Metric] = [
+    tool_calls,
+    tool_errors,
+    tool_in_flight,
+    tool_seconds,
+    tool_upstream_seconds,
+    tool_overhead_seconds,
+    tool_response_bytes,
+    upstream_requests,
+    upstream_in_flight,
+    upstream_seconds,
+]
+
+# Functions returning metrics computed when scraped, e.g. cache statistics.
+collectors: List[Callable[[], Iterable[Metric]]] = []
+_caches: Dict[str, Any] = {}
+
+
+def watch_cache(name: str, cache: Any) -> None:
+    """
+    Export the ``stats()`` of a ``cache.TTLCache`` under ``cache="name"``.
+    """
+    _caches[name] = cache
+
+
+def _cache_metrics() -> Iterable[Metric]:
+    hits = Counter("polygon_cache_hits_total", "Cache lookups answered.")
+    misses = Counter("polygon_cache_misses_total", "Cache lookups not answered.")
+    evictions = Counter(
+        "polygon_cache_evictions_total", "Entries evicted to stay within budget."
+    )
+    ratio = Gauge("polygon_cache_hit_ratio", "Share of lookups answered.")
+    size = Gauge("polygon_cache_bytes", "Approximate size of the cached values.")
+    for name, cache in sorted(_caches.items()):
+        stats = cache.stats()
+        lookups = stats["hits"] + stats["misses"]
+        hits.inc(stats["hits"], cache=name)
+        misses.inc(stats["misses"], cache=name)
+        evictions.inc(stats["evictions"], cache=name)
+        ratio.set(stats["hits"] / lookups if lookups else 0, cache=name)
+        size.set(stats["bytes"], cache=name)
+    return [hits, misses, evictions, ratio, size]
+
+
+collectors.append(_cache_metrics)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for collect in collectors:
+        for metric in collect():
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class ToolCall:
+    """
+    Accounting for one tool call. Time waiting on Polygon is the union of
+    the intervals with at least one request outstanding, so concurrent
+    requests of a batch tool aren't counted twice.
+    """
+
+    __slots__ = ("upstream", "error", "failed", "response_bytes", "_waiting", "_since")
+
+    def __init__(self):
+        self.upstream = 0.0
+        self.error: Optional[str] = None
+        self.failed = False
+        self.response_bytes: Optional[int] = None
+        self._waiting = 0
+        self._since = 0.0
+
+    def fail(self, error: Optional[str] = None) -> None:
+        self.failed = True
+        self.error = error or self.error or "unknown"
+
+
+_call: ContextVar[Optional[ToolCall]] = ContextVar(
+    "mcp_polygon_tool_call", default=None
+)
+
+
+@contextmanager
+def tool_call(tool: str) -> Iterator[ToolCall]:
+    call = ToolCall()
+    token = _call.set(call)
+    tool_in_flight.inc(tool=tool)
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        call.fail(type(e).__name__)
+        raise
+    finally:
+        _call.reset(token)
+        tool_in_flight.dec(tool=tool)
+        elapsed = time.perf_counter() - start
+        tool_seconds.observe(elapsed, tool=tool)
+        tool_upstream_seconds.observe(call.upstream, tool=tool)
+        tool_overhead_seconds.observe(max(0.0, elapsed - call.upstream), tool=tool)
+        tool_calls.inc(tool=tool, outcome="error" if call.failed else "ok")
+        if call.failed:
+            tool_errors.inc(tool=tool, error=call.error)
+        if call.response_bytes is not None:
+            tool_response_bytes.observe(call.response_bytes, tool=tool)
+
+
+@contextmanager
+def upstream_wait() -> Iterator[None]:
+    """
+    Count the enclosed wait for a Polygon response, including retries and
+    rate limiting, toward the current tool call.
+    """
+    call = _call.get()
+    if call is None:
+        yield
+        return
+    if call._waiting == 0:
+        call._since = time.perf_counter()
+    call._waiting += 1
+    try:
+        yield
+    except Exception as e:
+        call.error = type(e).__name__
+        raise
+    finally:
+        call._waiting -= 1
+        if call._waiting == 0:
+            call.upstream += time.perf_counter() - call._since
+
+
+@contextmanager
+def upstream_request(method: Optional[str]) -> Iterator[None]:
+    """
+    Time one Polygon HTTP request made for ``method``.
+    """
+    method = method or "next_url"
+    upstream_in_flight.inc()
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception as e:
+        outcome = type(e).__name__
+        raise
+    finally:
+        upstream_in_flight.dec()
+        upstream_seconds.observe(time.perf_counter() - start, method=method)
+        upstream_requests.inc(method=method, outcome=outcome)
@@ -0,0 +1,377 @@
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _EASTERN: Optional[ZoneInfo] = ZoneInfo("America/New_York")
+except Exception:
+    _EASTERN = None
+
+from mcp_polygon.cache import TTLCache, make_key
+from mcp_polygon.metrics import watch_cache
+from mcp_polygon.pagination import POLYGON_MAX_PAGES, fetch_pages
+
+# Seconds a fetched slice of an option chain is reused. 0 disables caching.
+POLYGON_CHAIN_TTL = float(os.environ.get("POLYGON_CHAIN_TTL", "15"))
+POLYGON_CHAIN_CACHE_MAX_BYTES = int(
+    os.environ.get("POLYGON_CHAIN_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+# Most expiration windows of one chain fetched at once.
+POLYGON_CHAIN_CONCURRENCY = int(os.environ.get("POLYGON_CHAIN_CONCURRENCY", "8"))
+
+# Days to expiration at which the chain is split into windows that are
+# paged through concurrently. Near-dated expirations hold most contracts,
+# so the windows are narrowest there.
+WINDOW_BOUNDARIES = (1, 2, 3, 4, 5, 6, 7, 14, 30, 60, 90, 180, 365, 730)
+# Rough in-memory size of one chain contract, for the cache budget.
+CONTRACT_BYTES = 1024
+
+chain_cache = TTLCache(max_bytes=POLYGON_CHAIN_CACHE_MAX_BYTES)
+watch_cache("option_chain", chain_cache)
+
+# Delta of the out-of-the-money contracts compared for the IV skew.
+SKEW_DELTA = 0.25
+
+
+def trading_day() -> date:
+    """
+    Today's date in US/Eastern, the calendar options expire by.
+    """
+    return datetime.now(_EASTERN).date() if _EASTERN else date.today()
+
+
+def dte_bounds(
+    dte_min: Optional[int] = None, dte_max: Optional[int] = None
+) -> Tuple[Optional[date], Optional[date]]:
+    """
+    Expiration dates matching a days-to-expiration window.
+    """
+    today = trading_day()
+    return (
+        None if dte_min is None else today + timedelta(days=dte_min),
+        None if dte_max is None else today + timedelta(days=dte_max),
+    )
+
+
+def _windows(
+    gte: Optional[date], lte: Optional[date]
+) -> List[Tuple[Optional[date], Optional[date]]]:
+    # The first and last windows are open-ended so that together the windows
+    # cover every expiration in [gte, lte] whatever today's date is.
+    today = trading_day()
+    edges = [today + timedelta(days=days) for days in WINDOW_BOUNDARIES]
+    starts: List[Optional[date]] = [None, *edges]
+    ends: List[Optional[date]] = [edge - timedelta(days=1) for edge in edges]
+    ends.append(None)
+
+    windows = []
+    for start, end in zip(starts, ends):
+        if gte is not None and (start is None or start < gte):
+            start = gte
+        if lte is not None and (end is None or end > lte):
+            end = lte
+        if start is None or end is None or start <= end:
+            windows.append((start, end))
+    return windows
+
+
+async def _fetch_window(
+    underlying_asset: str, params: Dict[str, Any], max_pages: int = POLYGON_MAX_PAGES
+) -> Tuple[List[Dict[str, Any]], bool]:
+    key = make_key(
+        "list_snapshot_options_chain",
+        {"ticker": underlying_asset, "max_pages": max_pages, **params},
+    )
+    cached = chain_cache.get(key)
+    if cached is not None:
+        return cached
+
+    page = await fetch_pages(
+        "list_snapshot_options_chain",
+        underlying_asset=underlying_asset,
+        max_pages=max_pages,
+        params=params,
+    )
+    if page.get("status") not in ("OK", "DELAYED"):
+        raise ValueError(page.get("error") or page.get("message") or str(page))
+    window = (
+        page.get("results") or [],
+        bool(page.get("truncated") or page.get("next_url")),
+    )
+    chain_cache.set(key, window, POLYGON_CHAIN_TTL, len(window[0]) * CONTRACT_BYTES)
+    return window
+
+
+async def fetch_chain(
+    underlying_asset: str,
+    *,
+    expiration_gte: Optional[date] = None,
+    expiration_lte: Optional[date] = None,
+    strike_gte: Optional[float] = None,
+    strike_lte: Optional[float] = None,
+    contract_type: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch every contract of an option chain snapshot within the given
+    expiration and strike bounds.
+
+    A first request asks for the whole range; chains that fit in one page
+    are done with it. Polygon's cursors can only be followed one page at a
+    time, so larger chains are split into expiration windows that are paged
+    through concurrently, at most ``POLYGON_CHAIN_CONCURRENCY`` at a time.
+    Each request is cached for ``POLYGON_CHAIN_TTL`` seconds, and the result
+    must be treated as read-only. ``truncated`` is set if a window hit the
+    page or row limit.
+    """
+    base: Dict[str, Any] = {"limit": 250}
+    if strike_gte is not None:
+        base["strike_price.gte"] = strike_gte
+    if strike_lte is not None:
+        base["strike_price.lte"] = strike_lte
+    if contract_type is not None:
+        base["contract_type"] = contract_type
+    if params:
+        base.update(params)
+
+    def bounded(start: Optional[date], end: Optional[date]) -> Dict[str, Any]:
+        window_params = dict(base)
+        if start is not None:
+            window_params["expiration_date.gte"] = start.isoformat()
+        if end is not None:
+            window_params["expiration_date.lte"] = end.isoformat()
+        return window_params
+
+    # Every request costs a rate limit token, so only split the chain when
+    # it doesn't fit in one page.
+    probe = await _fetch_window(
+        underlying_asset, bounded(expiration_gte, expiration_lte), max_pages=1
+    )
+    if not probe[1]:
+        windows = [probe]
+    else:
+        semaphore = asyncio.Semaphore(max(1, POLYGON_CHAIN_CONCURRENCY))
+
+        async def window(start: Optional[date], end: Optional[date]):
+            async with semaphore:
+                return await _fetch_window(underlying_asset, bounded(start, end))
+
+        windows = await asyncio.gather(
+            *(
+                window(start, end)
+                for start, end in _windows(expiration_gte, expiration_lte)
+            )
+        )
+    contracts = [contract for rows, _ in windows for contract in rows]
+    chain: Dict[str, Any] = {
+        "status": "OK",
+        "count": len(contracts),
+        "results": contracts,
+    }
+    if any(truncated for _, truncated in windows):
+        chain["truncated"] = True
+    return chain
+
+
+def sort_contracts(
+    contracts: List[Dict[str, Any]],
+    sort: Optional[str] = None,
+    order: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Order chain snapshot rows like Polygon's ``sort`` and ``order`` do:
+    by ``ticker``, ``expiration_date`` or ``strike_price`` from the contract
+    details, ticker by default. Rows missing the field go last.
+    """
+    field = sort or "ticker"
+
+    def value(contract: Dict[str, Any]) -> Any:
+        details = contract.get("details") or {}
+        return details.get(field, contract.get(field))
+
+    present = [c for c in contracts if value(c) is not None]
+    present.sort(key=value, reverse=order == "desc")
+    return present + [c for c in contracts if value(c) is None]
+
+
+def chain_arrays(contracts: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Turn option chain snapshot rows into one array per field. Missing
+    numbers become NaN (0 for open interest and volume).
+    """
+
+    def column(path: tuple, default: float = np.nan) -> np.ndarray:
+        values = []
+        for contract in contracts:
+            value: Any = contract
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+            values.append(default if value is None else value)
+        return np.asarray(values, dtype=np.float64)
+
+    return {
+        "strike": column(("details", "strike_price")),
+        "expiration": np.array(
+            [(c.get("details") or {}).get("expiration_date", "") for c in contracts]
+        ),
+        "is_call": np.array(
+            [
+                (c.get("details") or {}).get("contract_type") == "call"
+                for c in contracts
+            ],
+            dtype=bool,
+        ),
+        "multiplier": column(("details", "shares_per_contract"), 100),
+        "open_interest": column(("open_interest",), 0),
+        "volume": column(("day", "volume"), 0),
+        "iv": column(("implied_volatility",)),
+        "delta": column(("greeks", "delta")),
+        "gamma": column(("greeks", "gamma")),
+    }
+
+
+def underlying_price(contracts: List[Dict[str, Any]]) -> Optional[float]:
+    for contract in contracts:
+        price = (contract.get("underlying_asset") or {}).get("price")
+        if price:
+            return float(price)
+    return None
+
+
+def max_pain(strike: np.ndarray, is_call: np.ndarray, oi: np.ndarray) -> float:
+    """
+    Settlement price, among the listed strikes, at which the options
+    expire worth the least in total.
+    """
+    candidates = np.unique(strike)
+    intrinsic = np.where(
+        is_call,
+        np.maximum(candidates[:, None] - strike, 0),
+        np.maximum(strike - candidates[:, None], 0),
+    )
+    return float(candidates[np.argmin(intrinsic @ oi)])
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def _nearest_iv(iv: np.ndarray, distance: np.ndarray) -> Optional[float]:
+    usable = ~np.isnan(iv) & ~np.isnan(distance)
+    if not usable.any():
+        return None
+    return float(iv[usable][np.argmin(distance[usable])])
+
+
+def expiry_table(
+    arrays: Dict[str, np.ndarray], spot: Optional[float]
+) -> Dict[str, List[Any]]:
+    """
+    Per expiration: max pain, call and put open interest, put/call open
+    interest and volume ratios, at-the-money IV and the 25-delta skew
+    (put IV minus call IV).
+    """
+    table: Dict[str, List[Any]] = {
+        key: []
+        for key in (
+            "expiration_date",
+            "max_pain",
+            "call_oi",
+            "put_oi",
+            "put_call_oi_ratio",
+            "put_call_volume_ratio",
+            "atm_iv",
+            "put_25d_iv",
+            "call_25d_iv",
+            "skew_25d",
+        )
+    }
+    for expiration in np.unique(arrays["expiration"]):
+        mask = arrays["expiration"] == expiration
+        strike, is_call = arrays["strike"][mask], arrays["is_call"][mask]
+        oi, volume = arrays["open_interest"][mask], arrays["volume"][mask]
+        iv, delta = arrays["iv"][mask], arrays["delta"][mask]
+        call_oi, put_oi = float(oi[is_call].sum()), float(oi[~is_call].sum())
+
+        atm = None
+        if spot is not None:
+            atm = _nearest_iv(iv, np.abs(strike - spot))
+        put_iv = _nearest_iv(np.where(is_call, np.nan, iv), np.abs(delta + SKEW_DELTA))
+        call_iv = _nearest_iv(np.where(is_call, iv, np.nan), np.abs(delta - SKEW_DELTA))
+
+        table["expiration_date"].append(str(expiration))
+        table["max_pain"].append(max_pain(strike, is_call, oi) if oi.any() else None)
+        table["call_oi"].append(call_oi)
+        table["put_oi"].append(put_oi)
+        table["put_call_oi_ratio"].append(_ratio(put_oi, call_oi))
+        table["put_call_volume_ratio"].append(
+            _ratio(float(volume[~is_call].sum()), float(volume[is_call].sum()))
+        )
+        table["atm_iv"].append(atm)
+        table["put_25d_iv"].append(put_iv)
+        table["call_25d_iv"].append(call_iv)
+        table["skew_25d"].append(
+            None if put_iv is None or call_iv is None else round(put_iv - call_iv, 4)
+        )
+    return table
+
+
+def gamma_exposure(
+    arrays: Dict[str, np.ndarray], spot: float, max_strikes: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Dealer gamma exposure by strike, in dollars of delta per 1% move of the
+    underlying, assuming dealers are long calls and short puts. Only the
+    ``max_strikes`` strikes nearest to ``spot`` are listed; totals cover
+    the whole chain.
+    """
+    gex = np.nan_to_num(arrays["gamma"]) * arrays["open_interest"]
+    gex *= arrays["multiplier"] * spot * spot * 0.01
+    strikes, index = np.unique(arrays["strike"], return_inverse=True)
+    call_gex = np.bincount(index, np.where(arrays["is_call"], gex, 0), len(strikes))
+    put_gex = -np.bincount(index, np.where(arrays["is_call"], 0, gex), len(strikes))
+    net_gex = call_gex + put_gex
+
+    listed = np.arange(len(strikes))
+    if max_strikes is not None and len(strikes) > max_strikes:
+        listed = np.sort(np.argsort(np.abs(strikes - spot))[:max_strikes])
+
+    return {
+        "total_gex": round(float(net_gex.sum()), 2),
+        "by_strike": {
+            "strike": strikes[listed].tolist(),
+            "call_gex": call_gex[listed].round(2).tolist(),
+            "put_gex": put_gex[listed].round(2).tolist(),
+            "net_gex": net_gex[listed].round(2).tolist(),
+        },
+    }
+
+
+def chain_analytics(
+    contracts: List[Dict[str, Any]],
+    spot: Optional[float] = None,
+    max_strikes: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Summarize an option chain snapshot into per-expiration statistics and
+    gamma exposure by strike. ``spot`` defaults to the underlying price in
+    the snapshot; without one, ATM IV and gamma exposure are left out.
+    """
+    arrays = chain_arrays(contracts)
+    spot = spot or underlying_price(contracts)
+    call_oi = float(arrays["open_interest"][arrays["is_call"]].sum())
+    put_oi = float(arrays["open_interest"][~arrays["is_call"]].sum())
+    return {
+        "contracts": len(contracts),
+        "underlying_price": spot,
+        "put_call_oi_ratio": _ratio(put_oi, call_oi),
+        "expirations": expiry_table(arrays, spot),
+        "gamma_exposure": (
+            gamma_exposure(arrays, spot, max_strikes) if spot is not None else None
+        ),
+    }
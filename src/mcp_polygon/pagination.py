@@ -0,0 +1,90 @@
+import os
+from typing import Any, Optional
+
+from mcp.server.fastmcp import Context
+
+from mcp_polygon.upstream import fetch, fetch_next, fetch_text
+
+# Hard limits for a single paginated tool call, regardless of the budget the
+# caller asks for.
+POLYGON_MAX_PAGES = int(os.environ.get("POLYGON_MAX_PAGES", "100"))
+POLYGON_MAX_ROWS = int(os.environ.get("POLYGON_MAX_ROWS", "50000"))
+
+
+async def fetch_pages(
+    method: str,
+    /,
+    *,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    ctx: Optional[Context] = None,
+    passthrough: bool = False,
+    **kwargs: Any,
+) -> Any:
+    """
+    Call a list endpoint and follow its ``next_url`` cursors until either
+    budget is spent, merging every page's ``results`` into one response.
+
+    With neither budget set only the first page is returned, unchanged, and
+    with ``passthrough`` also undecoded (see ``upstream.fetch_text``).
+    The merged response carries ``pages`` and, if more data is available,
+    the ``next_url`` to resume from. ``truncated`` is set when the last page
+    was cut short to honour ``max_rows``; it can't be resumed.
+
+    Each page is merged and released as soon as it arrives, and rows past
+    ``max_rows`` are dropped before they are kept, so memory stays bounded by
+    the row budget plus one page. If ``ctx`` is given, a progress
+    notification is sent after every page.
+    """
+    for name, budget in (("max_pages", max_pages), ("max_rows", max_rows)):
+        if budget is not None and budget < 1:
+            raise ValueError(f"{name} must be at least 1, got {budget}")
+    if max_pages is None and max_rows is None:
+        return await (fetch_text if passthrough else fetch)(method, **kwargs)
+    page = await fetch(method, **kwargs)
+
+    if max_pages is None:
+        max_pages = POLYGON_MAX_PAGES
+    if max_rows is None:
+        max_rows = POLYGON_MAX_ROWS
+    max_pages = min(max_pages, POLYGON_MAX_PAGES)
+    max_rows = min(max_rows, POLYGON_MAX_ROWS)
+    merged = {k: v for k, v in page.items() if k not in ("results", "next_url")}
+    # One row past the budget is kept to tell whether the data was truncated.
+    rows = list((page.get("results") or [])[: max_rows + 1])
+    next_url = page.get("next_url")
+    pages = 1
+    if ctx is not None:
+        await _report_progress(ctx, pages, len(rows), max_rows)
+
+    # Polygon cursors are opaque and each one is only known once the previous
+    # page has arrived, so pages are fetched one after another.
+    while next_url and pages < max_pages and len(rows) < max_rows:
+        page = await fetch_next(next_url, method, pages + 1)
+        rows.extend((page.get("results") or [])[: max_rows + 1 - len(rows)])
+        next_url = page.get("next_url")
+        pages += 1
+        if ctx is not None:
+            await _report_progress(ctx, pages, len(rows), max_rows)
+        del page
+
+    truncated = len(rows) > max_rows
+    del rows[max_rows:]
+    merged.update(results=rows, count=len(rows), pages=pages)
+    if truncated:
+        merged["truncated"] = True
+    elif next_url:
+        merged["next_url"] = next_url
+    return merged
+
+
+async def _report_progress(ctx: Context, pages: int, rows: int, max_rows: int) -> None:
+    try:
+        await ctx.report_progress(
+            min(rows, max_rows),
+            max_rows,
+            f"Fetched {pages} page(s), {min(rows, max_rows)} rows",
+        )
+    except ValueError:
+        # Called outside of an MCP request, e.g. from another tool.
+        pass
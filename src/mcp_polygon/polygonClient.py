@@ -1,5 +1,12 @@
 from importlib.metadata import version, PackageNotFoundError
+from concurrent.futures import ThreadPoolExecutor
 import os
+import socket
+import sys
+
+import certifi
+import urllib3
+from urllib3.connection import HTTPConnection
 from polygon import RESTClient
 
 from dotenv import load_dotenv
@@ -10,11 +17,80 @@ POLYGON_API_KEY = os.environ.get("POLYGON_API_KEY", "")
 if not POLYGON_API_KEY:
     print("Warning: POLYGON_API_KEY environment variable not set.")
 
+# Point the client at another host, e.g. the mock server in bench/.
+POLYGON_BASE_URL = os.environ.get("POLYGON_BASE_URL", "https://api.polygon.io")
+
+# Connection pool settings. POLYGON_POOL_MAXSIZE is the number of keep-alive
+# connections retained per host; it should be at least POLYGON_MAX_WORKERS or
+# the surplus connections are closed after every burst.
+POLYGON_NUM_POOLS = int(os.environ.get("POLYGON_NUM_POOLS", "10"))
+POLYGON_POOL_MAXSIZE = int(os.environ.get("POLYGON_POOL_MAXSIZE", "32"))
+POLYGON_POOL_PREWARM = int(os.environ.get("POLYGON_POOL_PREWARM", "4"))
+POLYGON_CONNECT_TIMEOUT = float(os.environ.get("POLYGON_CONNECT_TIMEOUT", "10"))
+POLYGON_READ_TIMEOUT = float(os.environ.get("POLYGON_READ_TIMEOUT", "10"))
+POLYGON_HTTP2 = os.environ.get("POLYGON_HTTP2", "").lower() in ("1", "true", "yes")
+
 version_number = "MCP-Polygon/unknown"
 try:
     version_number = f"MCP-Polygon/{version('mcp_polygon')}"
 except PackageNotFoundError:
     pass
 
-polygon_client = RESTClient(POLYGON_API_KEY)
-polygon_client.headers["User-Agent"] += f" {version_number}"
\ No newline at end of file
+if POLYGON_HTTP2:
+    try:
+        from urllib3.http2 import inject_into_urllib3
+
+        inject_into_urllib3()
+    except ImportError as e:
+        print(
+            f"Warning: HTTP/2 unavailable ({e}), falling back to HTTP/1.1.",
+            file=sys.stderr,
+        )
+
+polygon_client = RESTClient(POLYGON_API_KEY, base=POLYGON_BASE_URL)
+polygon_client.headers["User-Agent"] += f" {version_number}"
+
+# RESTClient keeps a single connection per host, which forces a fresh TCP and
+# TLS handshake for every concurrent request. Replace its pool manager with one
+# sized for the worker pool, using TCP keep-alive so idle connections survive.
+polygon_client.client = urllib3.PoolManager(
+    num_pools=POLYGON_NUM_POOLS,
+    maxsize=POLYGON_POOL_MAXSIZE,
+    block=False,
+    headers=polygon_client.headers,
+    ca_certs=certifi.where(),
+    cert_reqs="CERT_REQUIRED",
+    # Retries happen in resilience.call_with_retries, which knows the
+    # request's deadline; urllib3 only classifies the failure.
+    retries=polygon_client.client.connection_pool_kw["retries"].new(total=0),
+    timeout=urllib3.Timeout(
+        connect=POLYGON_CONNECT_TIMEOUT, read=POLYGON_READ_TIMEOUT
+    ),
+    socket_options=HTTPConnection.default_socket_options
+    + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)],
+)
+
+
+def _open_connection(_: int) -> None:
+    try:
+        polygon_client.client.request(
+            "HEAD",
+            polygon_client.BASE,
+            retries=False,
+            redirect=False,
+            timeout=POLYGON_CONNECT_TIMEOUT,
+        )
+    except urllib3.exceptions.HTTPError:
+        pass
+
+
+def prewarm_pool(connections: int = POLYGON_POOL_PREWARM) -> None:
+    """
+    Open keep-alive connections to Polygon ahead of the first tool call so
+    a burst after startup doesn't pay for TCP and TLS handshakes.
+    """
+    if connections <= 0:
+        return
+    connections = min(connections, POLYGON_POOL_MAXSIZE)
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        list(pool.map(_open_connection, range(connections)))
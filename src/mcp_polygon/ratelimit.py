@@ -0,0 +1,192 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Hashable, List, Optional
+
+from mcp.server.lowlevel.server import request_ctx
+
+from mcp_polygon.metrics import Counter, Gauge, Metric, collectors
+from mcp_polygon.tracing import span
+
+# Upstream request budget in requests per minute; 0 disables rate limiting.
+POLYGON_RATE_LIMIT = float(os.environ.get("POLYGON_RATE_LIMIT", "0"))
+# Requests that may be sent back to back before the rate applies.
+POLYGON_RATE_BURST = int(os.environ.get("POLYGON_RATE_BURST", "1"))
+# Processes sharing the budget above. Set by the server for its workers when
+# MCP_WORKERS is above 1; each process gets an equal share.
+MCP_WORKER_RATE_SHARE = max(1, int(os.environ.get("MCP_WORKER_RATE_SHARE", "1")))
+
+# Scheduling priority of polygon_client methods while requests are queued.
+# Lower values are served first; unlisted methods get DEFAULT_PRIORITY.
+PRIORITIES: Dict[str, int] = {
+    "get_last_trade": 0,
+    "get_last_quote": 0,
+    "get_last_crypto_trade": 0,
+    "get_last_forex_quote": 0,
+    "get_real_time_currency_conversion": 0,
+    "get_snapshot_ticker": 1,
+    "get_snapshot_option": 1,
+    "get_snapshot_crypto_book": 1,
+    "get_market_status": 1,
+    "get_previous_close_agg": 2,
+    "get_daily_open_close_agg": 2,
+    "vx.list_stock_financials": 8,
+    "vx.list_ipos": 8,
+    "list_ticker_news": 8,
+}
+DEFAULT_PRIORITY = 5
+
+
+def current_session() -> Hashable:
+    """
+    Identify the client on whose behalf the current request runs: the MCP
+    session, as named by the Mcp-Session-Id header or the SSE session_id
+    parameter over HTTP, falling back to the peer address for stateless
+    requests.
+    """
+    ctx = request_ctx.get(None)
+    if ctx is None:
+        return None
+    headers = getattr(ctx.request, "headers", None)
+    if headers is not None:
+        session_id = headers.get("mcp-session-id") or ctx.request.query_params.get(
+            "session_id"
+        )
+        if session_id:
+            return session_id
+    client = getattr(ctx.request, "client", None)
+    if client is not None:
+        # Behind a proxy this is the proxy's address, unless uvicorn is told
+        # to trust its X-Forwarded-For header through FORWARDED_ALLOW_IPS.
+        return client.host
+    return id(ctx.session)
+
+
+class RateLimiter:
+    """
+    Token bucket that hands out upstream requests by priority.
+
+    Waiting requests are grouped by priority, then by session; within a
+    priority, sessions take turns so one client's burst can't starve the
+    others. Must be used from a single event loop.
+    """
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.rate = per_minute / 60
+        self.burst = max(1, burst)
+        self.granted = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._queues: Dict[int, "OrderedDict[Hashable, Deque[asyncio.Future]]"] = {}
+        self._pump: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def queued(self) -> int:
+        return sum(
+            len(waiters)
+            for queue in self._queues.values()
+            for waiters in queue.values()
+        )
+
+    async def acquire(self, priority: int = DEFAULT_PRIORITY) -> None:
+        """
+        Wait until a request may be sent.
+        """
+        if self.rate <= 0:
+            return
+        self._refill()
+        if not self._queues and self._tokens >= 1:
+            self._tokens -= 1
+            self.granted += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._queues.setdefault(priority, OrderedDict())
+        queue.setdefault(current_session(), deque()).append(waiter)
+        if self._pump is None or self._pump.done():
+            self._pump = asyncio.ensure_future(self._run())
+
+        started = time.monotonic()
+        self.throttled += 1
+        try:
+            with span("rate_limit.wait", **{"rate_limit.priority": priority}):
+                await waiter
+        finally:
+            self.wait_seconds += time.monotonic() - started
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "queued": self.queued,
+            "queued_by_priority": {
+                priority: sum(len(waiters) for waiters in queue.values())
+                for priority, queue in sorted(self._queues.items())
+            },
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "wait_seconds": self.wait_seconds,
+        }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        while self._queues:
+            priority = min(self._queues)
+            queue = self._queues[priority]
+            session, waiters = queue.popitem(last=False)
+            waiter = waiters.popleft()
+            if waiters:
+                # Back of the line for the rest of this session's requests.
+                queue[session] = waiters
+            if not queue:
+                del self._queues[priority]
+            if not waiter.done():
+                return waiter
+        return None
+
+    async def _run(self) -> None:
+        while self._queues:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+            waiter = self._next_waiter()
+            if waiter is not None:
+                self._tokens -= 1
+                self.granted += 1
+                waiter.set_result(None)
+
+
+rate_limiter = RateLimiter(
+    POLYGON_RATE_LIMIT / MCP_WORKER_RATE_SHARE,
+    math.ceil(POLYGON_RATE_BURST / MCP_WORKER_RATE_SHARE),
+)
+
+
+def _rate_limit_metrics() -> List[Metric]:
+    queued = Gauge("polygon_rate_limit_queued", "Requests waiting for the rate limit.")
+    throttled = Counter(
+        "polygon_rate_limit_throttled_total", "Requests that had to wait."
+    )
+    wait = Counter(
+        "polygon_rate_limit_wait_seconds_total", "Time requests spent waiting."
+    )
+    queued.set(rate_limiter.queued)
+    throttled.inc(rate_limiter.throttled)
+    wait.inc(rate_limiter.wait_seconds)
+    return [queued, throttled, wait]
+
+
+collectors.append(_rate_limit_metrics)
+
+
+def priority_of(method: Optional[str]) -> int:
+    if method is None:
+        return DEFAULT_PRIORITY
+    return PRIORITIES.get(method, DEFAULT_PRIORITY)
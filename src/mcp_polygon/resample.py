@@ -0,0 +1,130 @@
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Target size for aggregate results. Responses whose bars would serialize to
+# more than this are rolled up to fit. 0 disables the budget.
+POLYGON_AGGS_MAX_BYTES = int(os.environ.get("POLYGON_AGGS_MAX_BYTES", "0"))
+
+DOWNSAMPLE_METHODS = ("ohlcv", "lttb")
+
+
+def _column(bars: List[Dict[str, Any]], key: str) -> np.ndarray:
+    return np.fromiter(
+        (bar.get(key, 0) for bar in bars), dtype=np.float64, count=len(bars)
+    )
+
+
+def rollup_ohlcv(bars: List[Dict[str, Any]], max_bars: int) -> List[Dict[str, Any]]:
+    """
+    Roll ascending bars up into equal-width time buckets so that at most
+    ``max_bars`` remain. Each bucket keeps the first open, highest high,
+    lowest low and last close, sums volume and trade count and
+    volume-weights the VWAP.
+    """
+    t = np.fromiter((bar["t"] for bar in bars), dtype=np.int64, count=len(bars))
+    width = max(1, math.ceil((int(t[-1]) - int(t[0]) + 1) / max_bars))
+    buckets = (t - t[0]) // width
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.append(starts[1:], len(bars)) - 1
+
+    keys = bars[0].keys()
+    columns: Dict[str, np.ndarray] = {"t": t[starts]}
+    if "o" in keys:
+        columns["o"] = _column(bars, "o")[starts]
+    if "h" in keys:
+        columns["h"] = np.maximum.reduceat(_column(bars, "h"), starts)
+    if "l" in keys:
+        columns["l"] = np.minimum.reduceat(_column(bars, "l"), starts)
+    if "c" in keys:
+        columns["c"] = _column(bars, "c")[ends]
+    if "v" in keys:
+        v = _column(bars, "v")
+        columns["v"] = np.add.reduceat(v, starts)
+        if "vw" in keys:
+            notional = np.add.reduceat(_column(bars, "vw") * v, starts)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                vw = notional / columns["v"]
+            columns["vw"] = np.where(columns["v"] > 0, vw, columns.get("c", 0.0))
+    if "n" in keys:
+        columns["n"] = np.add.reduceat(_column(bars, "n"), starts).astype(np.int64)
+
+    lists = {key: column.tolist() for key, column in columns.items()}
+    return [dict(zip(lists, row)) for row in zip(*lists.values())]
+
+
+def lttb(bars: List[Dict[str, Any]], max_bars: int) -> List[Dict[str, Any]]:
+    """
+    Keep ``max_bars`` of the ascending bars using Largest-Triangle-Three-
+    Buckets on the close, which preserves the visual shape of the series.
+    """
+    if max_bars < 3:
+        return [bars[0], bars[-1]][:max_bars]
+    x = np.fromiter((bar["t"] for bar in bars), dtype=np.float64, count=len(bars))
+    y = _column(bars, "c")
+    edges = np.linspace(1, len(bars) - 1, max_bars - 1).astype(np.int64)
+
+    selected = [0]
+    for i in range(max_bars - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nxt = slice(hi, edges[i + 2] if i + 2 < len(edges) else len(bars))
+        avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        ax, ay = x[selected[-1]], y[selected[-1]]
+        area = np.abs((ax - avg_x) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y - ay))
+        selected.append(lo + int(np.argmax(area)))
+    selected.append(len(bars) - 1)
+    return [bars[i] for i in selected]
+
+
+def downsample_aggs(
+    response: Dict[str, Any],
+    max_bars: Optional[int] = None,
+    method: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Reduce the bars of an aggregates response to at most ``max_bars``, or to
+    fit ``POLYGON_AGGS_MAX_BYTES`` when no limit is given.
+
+    The response is returned untouched if it already fits. Otherwise a copy
+    is returned with a ``downsampled`` entry describing the reduction.
+    """
+    method = method or "ohlcv"
+    if method not in DOWNSAMPLE_METHODS:
+        raise ValueError(f"downsample must be one of {', '.join(DOWNSAMPLE_METHODS)}")
+
+    bars = response.get("results") or []
+    if not bars:
+        return response
+    if max_bars is None and POLYGON_AGGS_MAX_BYTES:
+        bar_bytes = len(json.dumps(bars[0])) + 2
+        if len(bars) * bar_bytes > POLYGON_AGGS_MAX_BYTES:
+            max_bars = max(1, POLYGON_AGGS_MAX_BYTES // bar_bytes)
+    if max_bars is None or len(bars) <= max_bars:
+        return response
+    max_bars = max(1, max_bars)
+
+    descending = len(bars) > 1 and bars[0]["t"] > bars[-1]["t"]
+    if descending:
+        bars = bars[::-1]
+    reduced = (
+        rollup_ohlcv(bars, max_bars) if method == "ohlcv" else lttb(bars, max_bars)
+    )
+    if descending:
+        reduced.reverse()
+
+    downsampled = {
+        **response,
+        "results": reduced,
+        "resultsCount": len(reduced),
+        "downsampled": {
+            "method": method,
+            "bars_in": len(bars),
+            "bars_out": len(reduced),
+        },
+    }
+    if "count" in response:
+        downsampled["count"] = len(reduced)
+    return downsampled
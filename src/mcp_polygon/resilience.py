@@ -0,0 +1,258 @@
+import asyncio
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import urllib3
+from mcp.server.lowlevel.server import request_ctx
+
+from mcp_polygon.metrics import Gauge, Metric, collectors
+from mcp_polygon.ratelimit import priority_of, rate_limiter
+
+T = TypeVar("T")
+
+# Attempts after the first for requests that fail with a connection error,
+# timeout or a retryable status (429, 5xx).
+POLYGON_RETRIES = int(os.environ.get("POLYGON_RETRIES", "3"))
+# Base and cap in seconds of the exponential backoff between attempts.
+POLYGON_RETRY_BACKOFF = float(os.environ.get("POLYGON_RETRY_BACKOFF", "0.25"))
+POLYGON_RETRY_BACKOFF_MAX = float(os.environ.get("POLYGON_RETRY_BACKOFF_MAX", "4"))
+# Time budget in seconds for all upstream requests of one tool call, retries
+# included. 0 disables the deadline.
+POLYGON_DEADLINE = float(os.environ.get("POLYGON_DEADLINE", "30"))
+# Consecutive failures that open the circuit of an endpoint family, and the
+# seconds it stays open before a trial request is let through.
+POLYGON_BREAKER_THRESHOLD = int(os.environ.get("POLYGON_BREAKER_THRESHOLD", "5"))
+POLYGON_BREAKER_COOLDOWN = float(os.environ.get("POLYGON_BREAKER_COOLDOWN", "30"))
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling Polygon while an endpoint family is failing.
+    """
+
+
+class DeadlineExceededError(TimeoutError):
+    """
+    Raised when a tool call runs out of time for upstream requests.
+    """
+
+
+class CircuitBreaker:
+    """
+    Opens after ``threshold`` consecutive failures and fails fast for
+    ``cooldown`` seconds. After that a single trial request is let through;
+    it closes the circuit on success and reopens it on failure.
+    """
+
+    def __init__(self, name: str, threshold: int, cooldown: float):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._trial or time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def check(self) -> None:
+        """
+        Raise CircuitOpenError unless a request may be sent.
+        """
+        if self.threshold <= 0 or self.opened_at is None:
+            return
+        wait = self.opened_at + self.cooldown - time.monotonic()
+        if wait > 0 or self._trial:
+            raise CircuitOpenError(
+                f"Polygon {self.name} endpoints are failing; "
+                f"not retrying for {max(wait, 0):.0f}s"
+            )
+
+    def allow(self) -> bool:
+        """
+        Like ``check``, and returns True if the request is the half-open
+        trial, which must end with ``record_success``, ``record_failure``
+        or ``end_trial``.
+        """
+        self.check()
+        if self.threshold <= 0 or self.opened_at is None:
+            return False
+        self._trial = True
+        return True
+
+    def end_trial(self) -> None:
+        """
+        Give up the trial without an outcome, e.g. when it was cancelled.
+        """
+        self._trial = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial or (self.threshold and self.failures >= self.threshold):
+            self.opened_at = time.monotonic()
+        self._trial = False
+
+
+breakers: Dict[str, CircuitBreaker] = {}
+
+
+def _breaker_metrics() -> List[Metric]:
+    state = Gauge(
+        "polygon_circuit_breaker_open",
+        "1 while an endpoint family's circuit breaker is open or half open.",
+    )
+    for family, breaker in sorted(breakers.items()):
+        state.set(breaker.state != "closed", family=family)
+    return [state]
+
+
+collectors.append(_breaker_metrics)
+
+# Substrings of polygon_client method names and the family they belong to,
+# checked in order.
+_FAMILIES = (
+    ("futures", "futures"),
+    ("benzinga", "benzinga"),
+    ("snapshot", "snapshots"),
+    ("option", "options"),
+    ("agg", "aggs"),
+    ("trade", "ticks"),
+    ("quote", "ticks"),
+)
+
+
+def family_of(method: Optional[str]) -> str:
+    """
+    Group polygon_client methods into endpoint families that share a
+    circuit breaker.
+    """
+    name = method or ""
+    for marker, family in _FAMILIES:
+        if marker in name:
+            return family
+    return "reference"
+
+
+def breaker_for(method: Optional[str]) -> CircuitBreaker:
+    family = family_of(method)
+    breaker = breakers.get(family)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            family, POLYGON_BREAKER_THRESHOLD, POLYGON_BREAKER_COOLDOWN
+        )
+        breakers[family] = breaker
+    return breaker
+
+
+_deadline: ContextVar[Optional[Tuple[Any, float]]] = ContextVar(
+    "polygon_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[float]:
+    """
+    Event loop time by which the current MCP request must be done with
+    upstream calls, or None outside a request. The clock starts with the
+    first upstream call of the request.
+    """
+    ctx = request_ctx.get(None)
+    if ctx is None or POLYGON_DEADLINE <= 0:
+        return None
+    current = _deadline.get()
+    if current is None or current[0] is not ctx:
+        current = (ctx, asyncio.get_running_loop().time() + POLYGON_DEADLINE)
+        _deadline.set(current)
+    return current[1]
+
+
+def is_transient(exc: BaseException) -> bool:
+    """
+    Whether a failed request is worth retrying. Polygon's 4xx responses
+    raise the SDK's BadResponse and are not; connection errors, timeouts
+    and retryable statuses surface from urllib3.
+    """
+    return isinstance(exc, urllib3.exceptions.HTTPError)
+
+
+async def _within(awaitable: Awaitable[T], deadline: Optional[float]) -> T:
+    if deadline is None:
+        return await awaitable
+    timeout = deadline - asyncio.get_running_loop().time()
+    if timeout <= 0:
+        # Close the coroutine rather than leave it never awaited.
+        getattr(awaitable, "close", lambda: None)()
+        raise DeadlineExceededError("Polygon request deadline exceeded")
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceededError("Polygon request deadline exceeded") from None
+
+
+async def call_with_retries(
+    method: Optional[str],
+    call: Callable[[], Awaitable[T]],
+    deadline: Optional[float] = None,
+) -> T:
+    """
+    Await ``call()``, retrying transient failures with full-jitter
+    exponential backoff until ``POLYGON_RETRIES`` or ``deadline`` runs out.
+    Each attempt first waits for the rate limiter, then goes through the
+    circuit breaker of the method's family. Time spent queued counts
+    toward the deadline but not as a failure of the endpoint: running out
+    of time is never recorded by the breaker, only attempts that failed at
+    Polygon are.
+    """
+    loop = asyncio.get_running_loop()
+    breaker = breaker_for(method)
+    priority = priority_of(method)
+    attempt = 0
+    while True:
+        # Fail fast rather than queue for the rate limit first.
+        breaker.check()
+        await _within(rate_limiter.acquire(priority), deadline)
+        trial = breaker.allow()
+        try:
+            result = await _within(call(), deadline)
+        except DeadlineExceededError:
+            # The deadline may have been spent queueing for the rate limit,
+            # leaving Polygon too little time to answer; read timeouts from
+            # urllib3 are what count against the endpoint.
+            if trial:
+                breaker.end_trial()
+            raise
+        except Exception as e:
+            if not is_transient(e):
+                # Polygon answered; the request itself was bad.
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt >= POLYGON_RETRIES or breaker.state == "open":
+                raise
+            delay = random.uniform(
+                0, min(POLYGON_RETRY_BACKOFF_MAX, POLYGON_RETRY_BACKOFF * 2**attempt)
+            )
+            if deadline is not None and loop.time() + delay >= deadline:
+                raise
+            attempt += 1
+            await asyncio.sleep(delay)
+        except BaseException:
+            # Cancelled: the outcome is unknown, so let another trial through.
+            if trial:
+                breaker.end_trial()
+            raise
+        else:
+            breaker.record_success()
+            return result
@@ -1,8 +1,7 @@
-from mcp_polygon.polygonClient import polygon_client
+from mcp_polygon.upstream import fetch_text
 
 from typing import Optional, Dict, Any, Union
 from datetime import datetime, date
-import json
 from ..server import poly_mcp
 
 __all__ = ["list_treasury_yields", "list_inflation"]
@@ -24,7 +23,8 @@ async def list_treasury_yields(
     Retrieve treasury yield data.
     """
     try:
-        results = polygon_client.list_treasury_yields(
+        return await fetch_text(
+            "list_treasury_yields",
             date=date,
             date_lt=date_lt,
             date_lte=date_lte,
@@ -34,11 +34,7 @@ async def list_treasury_yields(
             sort=sort,
             order=order,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -59,7 +55,8 @@ async def list_inflation(
     Get inflation data from the Federal Reserve.
     """
     try:
-        results = polygon_client.list_inflation(
+        return await fetch_text(
+            "list_inflation",
             date=date,
             date_any_of=date_any_of,
             date_gt=date_gt,
@@ -69,11 +66,7 @@ async def list_inflation(
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -1,8 +1,7 @@
-from mcp_polygon.polygonClient import polygon_client
+from mcp_polygon.pagination import fetch_pages
 
 from typing import Optional, Dict, Any, Union
 from datetime import datetime, date
-import json
 from ..server import poly_mcp
 
 __all__ = ["list_benzinga_analyst_insights", "list_benzinga_analysts", "list_benzinga_consensus_ratings", "list_benzinga_earnings", "list_benzinga_firms", "list_benzinga_guidance", "list_benzinga_news"]
@@ -53,13 +52,18 @@ async def list_benzinga_analyst_insights(
     benzinga_rating_id_lte: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     List Benzinga analyst insights.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
     """
     try:
-        results = polygon_client.list_benzinga_analyst_insights(
+        return await fetch_pages(
+            "list_benzinga_analyst_insights",
             date=date,
             date_any_of=date_any_of,
             date_gt=date_gt,
@@ -104,12 +108,11 @@ async def list_benzinga_analyst_insights(
             benzinga_rating_id_lte=benzinga_rating_id_lte,
             limit=limit,
             sort=sort,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            passthrough=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -142,13 +145,18 @@ async def list_benzinga_analysts(
     full_name_lte: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     List Benzinga analysts.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
     """
     try:
-        results = polygon_client.list_benzinga_analysts(
+        return await fetch_pages(
+            "list_benzinga_analysts",
             benzinga_id=benzinga_id,
             benzinga_id_any_of=benzinga_id_any_of,
             benzinga_id_gt=benzinga_id_gt,
@@ -175,12 +183,11 @@ async def list_benzinga_analysts(
             full_name_lte=full_name_lte,
             limit=limit,
             sort=sort,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            passthrough=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -194,13 +201,18 @@ async def list_benzinga_consensus_ratings(
     date_lt: Optional[Union[str, date]] = None,
     date_lte: Optional[Union[str, date]] = None,
     limit: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     List Benzinga consensus ratings for a ticker.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
     """
     try:
-        results = polygon_client.list_benzinga_consensus_ratings(
+        return await fetch_pages(
+            "list_benzinga_consensus_ratings",
             ticker=ticker,
             date=date,
             date_gt=date_gt,
@@ -208,12 +220,11 @@ async def list_benzinga_consensus_ratings(
             date_lt=date_lt,
             date_lte=date_lte,
             limit=limit,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            passthrough=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -276,13 +287,18 @@ async def list_benzinga_earnings(
     fiscal_period_lte: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     List Benzinga earnings.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
     """
     try:
-        results = polygon_client.list_benzinga_earnings(
+        return await fetch_pages(
+            "list_benzinga_earnings",
             date=date,
             date_any_of=date_any_of,
             date_gt=date_gt,
@@ -339,12 +355,11 @@ async def list_benzinga_earnings(
             fiscal_period_lte=fiscal_period_lte,
             limit=limit,
             sort=sort,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            passthrough=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -359,13 +374,18 @@ async def list_benzinga_firms(
     benzinga_id_lte: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     List Benzinga firms.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
     """
     try:
-        results = polygon_client.list_benzinga_firms(
+        return await fetch_pages(
+            "list_benzinga_firms",
             benzinga_id=benzinga_id,
             benzinga_id_any_of=benzinga_id_any_of,
             benzinga_id_gt=benzinga_id_gt,
@@ -374,12 +394,11 @@ async def list_benzinga_firms(
             benzinga_id_lte=benzinga_id_lte,
             limit=limit,
             sort=sort,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            passthrough=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -430,13 +449,18 @@ async def list_benzinga_guidance(
     fiscal_period_lte: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     List Benzinga guidance.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
     """
     try:
-        results = polygon_client.list_benzinga_guidance(
+        return await fetch_pages(
+            "list_benzinga_guidance",
             date=date,
             date_any_of=date_any_of,
             date_gt=date_gt,
@@ -481,12 +505,11 @@ async def list_benzinga_guidance(
             fiscal_period_lte=fiscal_period_lte,
             limit=limit,
             sort=sort,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            passthrough=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -522,13 +545,18 @@ async def list_benzinga_news(
     author_lte: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     List Benzinga news.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
     """
     try:
-        results = polygon_client.list_benzinga_news(
+        return await fetch_pages(
+            "list_benzinga_news",
             published=published,
             published_any_of=published_any_of,
             published_gt=published_gt,
@@ -558,12 +586,11 @@ async def list_benzinga_news(
             author_lte=author_lte,
             limit=limit,
             sort=sort,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            passthrough=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -626,13 +653,18 @@ async def list_benzinga_ratings(
     benzinga_firm_id_lte: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     List Benzinga ratings.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
     """
     try:
-        results = polygon_client.list_benzinga_ratings(
+        return await fetch_pages(
+            "list_benzinga_ratings",
             date=date,
             date_any_of=date_any_of,
             date_gt=date_gt,
@@ -689,12 +721,11 @@ async def list_benzinga_ratings(
             benzinga_firm_id_lte=benzinga_firm_id_lte,
             limit=limit,
             sort=sort,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            passthrough=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
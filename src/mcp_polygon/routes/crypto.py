@@ -1,7 +1,6 @@
 
 from typing import Optional, Dict, Any
-from mcp_polygon.polygonClient import polygon_client
-import json
+from mcp_polygon.upstream import fetch_text
 from ..server import poly_mcp
 
 __all__ = ["get_last_crypto_trade", "get_snapshot_crypto_book"]
@@ -16,12 +15,9 @@ async def get_last_crypto_trade(
     Get the most recent trade for a crypto pair.
     """
     try:
-        results = polygon_client.get_last_crypto_trade(
-            from_=from_, to=to, params=params, raw=True
+        return await fetch_text(
+            "get_last_crypto_trade", from_=from_, to=to, params=params
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
  
@@ -37,12 +33,9 @@ async def get_snapshot_crypto_book(
     Get snapshot for a crypto ticker's order book.
     """
     try:
-        results = polygon_client.get_snapshot_crypto_book(
-            ticker=ticker, params=params, raw=True
+        return await fetch_text(
+            "get_snapshot_crypto_book", ticker=ticker, params=params
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
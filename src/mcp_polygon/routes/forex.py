@@ -1,7 +1,6 @@
-from mcp_polygon.polygonClient import polygon_client
+from mcp_polygon.upstream import fetch_text
 
 from typing import Optional, Dict, Any
-import json
 from ..server import poly_mcp
 
 @poly_mcp.tool()
@@ -14,12 +13,9 @@ async def get_last_forex_quote(
     Get the most recent forex quote.
     """
     try:
-        results = polygon_client.get_last_forex_quote(
-            from_=from_, to=to, params=params, raw=True
+        return await fetch_text(
+            "get_last_forex_quote", from_=from_, to=to, params=params
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
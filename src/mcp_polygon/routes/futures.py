@@ -1,8 +1,8 @@
-from mcp_polygon.polygonClient import polygon_client
+from mcp_polygon.encoding import to_columnar
+from mcp_polygon.upstream import fetch, fetch_text
 
 from typing import Optional, Dict, Any, Union
 from datetime import date
-import json
 
 from ..server import poly_mcp
 
@@ -18,13 +18,19 @@ async def list_futures_aggregates(
     window_start_gte: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    compact: bool = False,
+    precision: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Get aggregates for a futures contract in a given time range.
+
+    Set compact to return one array per field with delta-encoded timestamps,
+    optionally rounding prices to precision decimals.
     """
     try:
-        results = polygon_client.list_futures_aggregates(
+        results = await fetch(
+            "list_futures_aggregates",
             ticker=ticker,
             resolution=resolution,
             window_start=window_start,
@@ -35,11 +41,8 @@ async def list_futures_aggregates(
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+        return to_columnar(results, precision) if compact else results
     except Exception as e:
         return {"error": str(e)}
 
@@ -60,7 +63,8 @@ async def list_futures_contracts(
     Get a paginated list of futures contracts.
     """
     try:
-        results = polygon_client.list_futures_contracts(
+        return await fetch_text(
+            "list_futures_contracts",
             product_code=product_code,
             first_trade_date=first_trade_date,
             last_trade_date=last_trade_date,
@@ -70,11 +74,7 @@ async def list_futures_contracts(
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -89,15 +89,12 @@ async def get_futures_contract_details(
     Get details for a single futures contract at a specified point in time.
     """
     try:
-        results = polygon_client.get_futures_contract_details(
+        return await fetch_text(
+            "get_futures_contract_details",
             ticker=ticker,
             as_of=as_of,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -121,7 +118,8 @@ async def list_futures_products(
     Get a list of futures products (including combos).
     """
     try:
-        results = polygon_client.list_futures_products(
+        return await fetch_text(
+            "list_futures_products",
             name=name,
             name_search=name_search,
             as_of=as_of,
@@ -134,11 +132,7 @@ async def list_futures_products(
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -154,16 +148,13 @@ async def get_futures_product_details(
     Get details for a single futures product as it was at a specific day.
     """
     try:
-        results = polygon_client.get_futures_product_details(
+        return await fetch_text(
+            "get_futures_product_details",
             product_code=product_code,
             type=type,
             as_of=as_of,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -189,7 +180,8 @@ async def list_futures_quotes(
     Get quotes for a futures contract in a given time range.
     """
     try:
-        results = polygon_client.list_futures_quotes(
+        return await fetch_text(
+            "list_futures_quotes",
             ticker=ticker,
             timestamp=timestamp,
             timestamp_lt=timestamp_lt,
@@ -204,11 +196,7 @@ async def list_futures_quotes(
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -234,7 +222,8 @@ async def list_futures_trades(
     Get trades for a futures contract in a given time range.
     """
     try:
-        results = polygon_client.list_futures_trades(
+        return await fetch_text(
+            "list_futures_trades",
             ticker=ticker,
             timestamp=timestamp,
             timestamp_lt=timestamp_lt,
@@ -249,11 +238,7 @@ async def list_futures_trades(
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -270,17 +255,14 @@ async def list_futures_schedules(
     Get trading schedules for multiple futures products on a specific date.
     """
     try:
-        results = polygon_client.list_futures_schedules(
+        return await fetch_text(
+            "list_futures_schedules",
             session_end_date=session_end_date,
             trading_venue=trading_venue,
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -301,7 +283,8 @@ async def list_futures_schedules_by_product_code(
     Get schedule data for a single futures product across many trading dates.
     """
     try:
-        results = polygon_client.list_futures_schedules_by_product_code(
+        return await fetch_text(
+            "list_futures_schedules_by_product_code",
             product_code=product_code,
             session_end_date=session_end_date,
             session_end_date_lt=session_end_date_lt,
@@ -311,11 +294,7 @@ async def list_futures_schedules_by_product_code(
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -332,17 +311,14 @@ async def list_futures_market_statuses(
     Get market statuses for futures products.
     """
     try:
-        results = polygon_client.list_futures_market_statuses(
+        return await fetch_text(
+            "list_futures_market_statuses",
             product_code_any_of=product_code_any_of,
             product_code=product_code,
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -369,7 +345,8 @@ async def get_futures_snapshot(
     Get snapshots for futures contracts.
     """
     try:
-        results = polygon_client.get_futures_snapshot(
+        return await fetch_text(
+            "get_futures_snapshot",
             ticker=ticker,
             ticker_any_of=ticker_any_of,
             ticker_gt=ticker_gt,
@@ -385,11 +362,7 @@ async def get_futures_snapshot(
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -1,9 +1,17 @@
-from mcp_polygon.polygonClient import polygon_client
+from mcp_polygon.aggstore import MAX_BARS_PER_REQUEST, fetch_aggs
+from mcp_polygon.batch import fetch_batch, fetch_batch_snapshot
+from mcp_polygon.encoding import to_columnar
+from mcp_polygon.indicators import compute_indicators
+from mcp_polygon.pagination import fetch_pages
+from mcp_polygon.resample import downsample_aggs
+from mcp_polygon.snapshots import snapshot_table
+from mcp_polygon.tickerindex import ticker_index
+from mcp_polygon.upstream import fetch_text
 
 from typing import Optional, Dict, Any, Union, List
 from datetime import datetime, date
-import json
-from ..server import poly_mcp
+from mcp.server.fastmcp import Context
+from ..server import poly_mcp, POLYGON_TOOL_ALIASES
 
 @poly_mcp.tool()
 async def list_conditions(
@@ -17,17 +25,14 @@ async def list_conditions(
     List conditions used by Polygon.io.
     """
     try:
-        results = polygon_client.list_conditions(
+        return await fetch_text(
+            "list_conditions",
             asset_class=asset_class,
             data_type=data_type,
             id=id,
             sip=sip,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -42,12 +47,9 @@ async def get_exchanges(
     List exchanges known by Polygon.io.
     """
     try:
-        results = polygon_client.get_exchanges(
-            asset_class=asset_class, locale=locale, params=params, raw=True
+        return await fetch_text(
+            "get_exchanges", asset_class=asset_class, locale=locale, params=params
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -62,12 +64,9 @@ async def get_ticker_types(
     List all ticker types supported by Polygon.io.
     """
     try:
-        results = polygon_client.get_ticker_types(
-            asset_class=asset_class, locale=locale, params=params, raw=True
+        return await fetch_text(
+            "get_ticker_types", asset_class=asset_class, locale=locale, params=params
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -81,10 +80,7 @@ async def get_market_holidays(
     Get upcoming market holidays and their open/close times.
     """
     try:
-        results = polygon_client.get_market_holidays(params=params, raw=True)
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+        return await fetch_text("get_market_holidays", params=params)
     except Exception as e:
         return {"error": str(e)}
 
@@ -97,10 +93,7 @@ async def get_market_status(
     Get current trading status of exchanges and financial markets.
     """
     try:
-        results = polygon_client.get_market_status(params=params, raw=True)
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+        return await fetch_text("get_market_status", params=params)
     except Exception as e:
         return {"error": str(e)}
 
@@ -119,13 +112,43 @@ async def list_tickers(
     sort: Optional[str] = None,
     order: Optional[str] = None,
     limit: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Query supported ticker symbols across stocks, indices, forex, and crypto.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
+
+    Results that include a ticker_index field come from a periodically
+    refreshed local copy of the ticker list (ticker_index gives its age),
+    with search results ranked by relevance. There, matches is the total
+    number of matching tickers and truncated is true when more matched than
+    limit allows; raise limit or narrow the query to see the rest.
     """
     try:
-        results = polygon_client.list_tickers(
+        # The local index exists when POLYGON_TICKER_INDEX_REFRESH is set.
+        # Queries it can't answer, that match nothing, or that are cut short
+        # without a search ranking (the caller is browsing and needs
+        # next_url to page) go to Polygon.
+        index = ticker_index(market, cusip, date, active, params)
+        if index is not None and max_pages is None and max_rows is None:
+            results = index.query(
+                ticker=ticker,
+                type=type,
+                market=market,
+                exchange=exchange,
+                cik=cik,
+                search=search,
+                sort=sort,
+                order=order,
+                limit=limit,
+            )
+            if results["results"] and (search or not results["truncated"]):
+                return results
+        return await fetch_pages(
+            "list_tickers",
             ticker=ticker,
             type=type,
             market=market,
@@ -138,12 +161,11 @@ async def list_tickers(
             sort=sort,
             order=order,
             limit=limit,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            passthrough=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -158,12 +180,9 @@ async def get_ticker_details(
     Get detailed information about a specific ticker.
     """
     try:
-        results = polygon_client.get_ticker_details(
-            ticker=ticker, date=date, params=params, raw=True
+        return await fetch_text(
+            "get_ticker_details", ticker=ticker, date=date, params=params
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -181,18 +200,15 @@ async def list_ticker_news(
     Get recent news articles for a stock ticker.
     """
     try:
-        results = polygon_client.list_ticker_news(
+        return await fetch_text(
+            "list_ticker_news",
             ticker=ticker,
             published_utc=published_utc,
             limit=limit,
             sort=sort,
             order=order,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -210,17 +226,14 @@ async def get_real_time_currency_conversion(
     Get real-time currency conversion.
     """
     try:
-        results = polygon_client.get_real_time_currency_conversion(
+        return await fetch_text(
+            "get_real_time_currency_conversion",
             from_=from_,
             to=to,
             amount=amount,
             precision=precision,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -238,18 +251,15 @@ async def list_universal_snapshots(
     Get universal snapshots for multiple assets of a specific type.
     """
     try:
-        results = polygon_client.list_universal_snapshots(
+        return await fetch_text(
+            "list_universal_snapshots",
             type=type,
             ticker_any_of=ticker_any_of,
             order=order,
             limit=limit,
             sort=sort,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -263,18 +273,24 @@ async def get_snapshot_all(
 ) -> Dict[str, Any]:
     """
     Get a snapshot of all tickers in a market.
+
+    Results that include a snapshot_cache field come from a periodically
+    refreshed copy of the stock market snapshot; snapshot_cache gives when
+    it was fetched and its age in seconds.
     """
     try:
-        results = polygon_client.get_snapshot_all(
+        # The copy exists when POLYGON_SNAPSHOT_REFRESH is set; otherwise, or
+        # when it is stale, the request goes to Polygon.
+        table = snapshot_table(market_type, include_otc, params)
+        if table is not None:
+            return table.all(tickers)
+        return await fetch_text(
+            "get_snapshot_all",
             market_type=market_type,
             tickers=tickers,
             include_otc=include_otc,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -288,18 +304,25 @@ async def get_snapshot_direction(
 ) -> Dict[str, Any]:
     """
     Get gainers or losers for a market.
+
+    Results that include a snapshot_cache field come from a periodically
+    refreshed copy of the stock market snapshot; snapshot_cache gives when
+    it was fetched and its age in seconds.
     """
     try:
-        results = polygon_client.get_snapshot_direction(
+        # The copy exists when POLYGON_SNAPSHOT_REFRESH is set; otherwise, or
+        # when it is stale, the request goes to Polygon.
+        table = snapshot_table(market_type, include_otc, params)
+        results = table.direction(direction) if table is not None else None
+        if results is not None:
+            return results
+        return await fetch_text(
+            "get_snapshot_direction",
             market_type=market_type,
             direction=direction,
             include_otc=include_otc,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -312,14 +335,21 @@ async def get_snapshot_ticker(
 ) -> Dict[str, Any]:
     """
     Get snapshot for a specific ticker.
+
+    Results that include a snapshot_cache field come from a periodically
+    refreshed copy of the stock market snapshot; snapshot_cache gives when
+    it was fetched and its age in seconds.
     """
     try:
-        results = polygon_client.get_snapshot_ticker(
-            market_type=market_type, ticker=ticker, params=params, raw=True
+        # The copy exists when POLYGON_SNAPSHOT_REFRESH is set; otherwise, or
+        # when it is stale, the request goes to Polygon.
+        table = snapshot_table(market_type, params=params)
+        results = table.ticker(ticker) if table is not None else None
+        if results is not None:
+            return results
+        return await fetch_text(
+            "get_snapshot_ticker", market_type=market_type, ticker=ticker, params=params
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -335,13 +365,26 @@ async def get_aggs(
     adjusted: Optional[bool] = None,
     sort: Optional[str] = None,
     limit: Optional[int] = None,
+    max_bars: Optional[int] = None,
+    downsample: Optional[str] = None,
+    compact: bool = False,
+    precision: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     List aggregate bars for a ticker over a given date range in custom time window sizes.
+    Works for stock, options (O:), index (I:), forex (C:) and crypto (X:) tickers.
+
+    Set max_bars to reduce the result to at most that many bars, either by
+    rolling bars up into coarser OHLCV intervals (downsample="ohlcv", the
+    default) or by keeping the most representative bars (downsample="lttb").
+
+    Set compact to return one array per field with delta-encoded timestamps,
+    optionally rounding prices to precision decimals.
     """
     try:
-        results = polygon_client.get_aggs(
+        results = await fetch_aggs(
+            "get_aggs",
             ticker=ticker,
             multiplier=multiplier,
             timespan=timespan,
@@ -351,47 +394,74 @@ async def get_aggs(
             sort=sort,
             limit=limit,
             params=params,
-            raw=True,
         )
-
-        # Parse the binary data to string and then to JSON
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+        results = downsample_aggs(results, max_bars=max_bars, method=downsample)
+        return to_columnar(results, precision) if compact else results
     except Exception as e:
         return {"error": str(e)}
 
 
+if POLYGON_TOOL_ALIASES:
+    poly_mcp.tool(
+        name="list_aggs",
+        description="Iterate through aggregate bars for a ticker over a given "
+        "date range.\n\nDeprecated: use get_aggs instead, which takes the same "
+        "arguments. This tool will be removed in a future release.",
+    )(get_aggs)
+
+
 @poly_mcp.tool()
-async def list_aggs(
+async def get_technical_indicators(
     ticker: str,
     multiplier: int,
     timespan: str,
     from_: Union[str, int, datetime, date],
     to: Union[str, int, datetime, date],
+    indicators: List[str],
     adjusted: Optional[bool] = None,
-    sort: Optional[str] = None,
-    limit: Optional[int] = None,
+    last: Optional[int] = None,
+    precision: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
-    Iterate through aggregate bars for a ticker over a given date range.
+    Compute technical indicators over aggregate bars for a ticker and return
+    only the indicator series, aligned with the bar timestamps in t.
+
+    indicators takes names with optional comma-separated parameters: sma:20,
+    ema:20, rsi:14, macd:12,26,9, bollinger:20,2, atr:14 and vwap. Values
+    are null until enough bars are available, so start from_ early enough
+    to cover the longest window. Set last to return only the final points.
     """
     try:
-        results = polygon_client.list_aggs(
+        results = await fetch_aggs(
+            "get_aggs",
             ticker=ticker,
             multiplier=multiplier,
             timespan=timespan,
             from_=from_,
             to=to,
             adjusted=adjusted,
-            sort=sort,
-            limit=limit,
+            sort="asc",
+            limit=MAX_BARS_PER_REQUEST,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+        if results.get("status") not in ("OK", "DELAYED"):
+            return results
+        series = compute_indicators(
+            results.get("results") or [],
+            indicators,
+            timespan=timespan,
+            last=last,
+            precision=precision,
+        )
+        return {
+            "ticker": ticker,
+            "multiplier": multiplier,
+            "timespan": timespan,
+            "status": results.get("status"),
+            "count": len(series["t"]),
+            **series,
+        }
     except Exception as e:
         return {"error": str(e)}
 
@@ -409,18 +479,15 @@ async def get_grouped_daily_aggs(
     Get grouped daily bars for entire market for a specific date.
     """
     try:
-        results = polygon_client.get_grouped_daily_aggs(
+        return await fetch_text(
+            "get_grouped_daily_aggs",
             date=date,
             adjusted=adjusted,
             include_otc=include_otc,
             locale=locale,
             market_type=market_type,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -436,12 +503,13 @@ async def get_daily_open_close_agg(
     Get daily open, close, high, and low for a specific ticker and date.
     """
     try:
-        results = polygon_client.get_daily_open_close_agg(
-            ticker=ticker, date=date, adjusted=adjusted, params=params, raw=True
+        return await fetch_text(
+            "get_daily_open_close_agg",
+            ticker=ticker,
+            date=date,
+            adjusted=adjusted,
+            params=params,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -456,12 +524,35 @@ async def get_previous_close_agg(
     Get previous day's open, close, high, and low for a specific ticker.
     """
     try:
-        results = polygon_client.get_previous_close_agg(
-            ticker=ticker, adjusted=adjusted, params=params, raw=True
+        return await fetch_text(
+            "get_previous_close_agg", ticker=ticker, adjusted=adjusted, params=params
         )
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@poly_mcp.tool()
+async def get_previous_close_aggs(
+    tickers: List[str],
+    adjusted: Optional[bool] = None,
+    use_snapshot: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Get previous day's open, close, high, and low for several tickers at once.
 
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+    Tickers that fail are listed under errors. Set use_snapshot to answer
+    stock tickers from a single snapshot request instead of one request per
+    ticker; it can't be combined with the other options.
+    """
+    try:
+        if use_snapshot:
+            return await fetch_batch_snapshot(
+                "get_previous_close_agg", tickers, adjusted=adjusted, params=params
+            )
+        return await fetch_batch(
+            "get_previous_close_agg", tickers, adjusted=adjusted, params=params
+        )
     except Exception as e:
         return {"error": str(e)}
 
@@ -477,13 +568,26 @@ async def list_trades(
     limit: Optional[int] = None,
     sort: Optional[str] = None,
     order: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    compact: bool = False,
+    precision: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
+    ctx: Context = None,
 ) -> Dict[str, Any]:
     """
     Get trades for a ticker symbol.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
+    Progress is reported after each page; all rows come back in the final
+    result.
+
+    Set compact to return one array per field with delta-encoded timestamps,
+    optionally rounding prices to precision decimals.
     """
     try:
-        results = polygon_client.list_trades(
+        results = await fetch_pages(
+            "list_trades",
             ticker=ticker,
             timestamp=timestamp,
             timestamp_lt=timestamp_lt,
@@ -493,12 +597,13 @@ async def list_trades(
             limit=limit,
             sort=sort,
             order=order,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            ctx=ctx,
+            passthrough=not compact,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+        return to_columnar(results, precision) if compact else results
     except Exception as e:
         return {"error": str(e)}
 
@@ -512,10 +617,28 @@ async def get_last_trade(
     Get the most recent trade for a ticker symbol.
     """
     try:
-        results = polygon_client.get_last_trade(ticker=ticker, params=params, raw=True)
+        return await fetch_text("get_last_trade", ticker=ticker, params=params)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@poly_mcp.tool()
+async def get_last_trades(
+    tickers: List[str],
+    use_snapshot: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Get the most recent trade for several ticker symbols at once.
 
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+    Tickers that fail are listed under errors. Set use_snapshot to answer
+    stock tickers from a single snapshot request instead of one request per
+    ticker; it can't be combined with the other options.
+    """
+    try:
+        if use_snapshot:
+            return await fetch_batch_snapshot("get_last_trade", tickers, params=params)
+        return await fetch_batch("get_last_trade", tickers, params=params)
     except Exception as e:
         return {"error": str(e)}
 
@@ -532,13 +655,26 @@ async def list_quotes(
     limit: Optional[int] = None,
     sort: Optional[str] = None,
     order: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    compact: bool = False,
+    precision: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
+    ctx: Context = None,
 ) -> Dict[str, Any]:
     """
     Get quotes for a ticker symbol.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
+    Progress is reported after each page; all rows come back in the final
+    result.
+
+    Set compact to return one array per field with delta-encoded timestamps,
+    optionally rounding prices to precision decimals.
     """
     try:
-        results = polygon_client.list_quotes(
+        results = await fetch_pages(
+            "list_quotes",
             ticker=ticker,
             timestamp=timestamp,
             timestamp_lt=timestamp_lt,
@@ -548,12 +684,13 @@ async def list_quotes(
             limit=limit,
             sort=sort,
             order=order,
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=params,
-            raw=True,
+            ctx=ctx,
+            passthrough=not compact,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+        return to_columnar(results, precision) if compact else results
     except Exception as e:
         return {"error": str(e)}
 
@@ -567,10 +704,28 @@ async def get_last_quote(
     Get the most recent quote for a ticker symbol.
     """
     try:
-        results = polygon_client.get_last_quote(ticker=ticker, params=params, raw=True)
+        return await fetch_text("get_last_quote", ticker=ticker, params=params)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@poly_mcp.tool()
+async def get_last_quotes(
+    tickers: List[str],
+    use_snapshot: bool = False,
+    params: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Get the most recent quote for several ticker symbols at once.
 
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+    Tickers that fail are listed under errors. Set use_snapshot to answer
+    stock tickers from a single snapshot request instead of one request per
+    ticker; it can't be combined with the other options.
+    """
+    try:
+        if use_snapshot:
+            return await fetch_batch_snapshot("get_last_quote", tickers, params=params)
+        return await fetch_batch("get_last_quote", tickers, params=params)
     except Exception as e:
         return {"error": str(e)}
 
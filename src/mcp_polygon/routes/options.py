@@ -1,9 +1,17 @@
-from mcp_polygon.polygonClient import polygon_client
+from mcp_polygon.greeks import fill_greeks, fill_response_greeks
+from mcp_polygon.optionchain import (
+    chain_analytics,
+    dte_bounds,
+    fetch_chain,
+    sort_contracts,
+)
+from mcp_polygon.pagination import fetch_pages
+from mcp_polygon.upstream import fetch, fetch_text
 
 from typing import Optional, Dict, Any, Union
 from datetime import datetime, date
-import json
-from ..server import poly_mcp
+from ..server import poly_mcp, POLYGON_TOOL_ALIASES
+from .meta import get_aggs
 
 @poly_mcp.tool()
 async def get_option_chain_snapshot(
@@ -14,12 +22,47 @@ async def get_option_chain_snapshot(
     order: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    strike_price_gte: Optional[float] = None,
+    strike_price_lte: Optional[float] = None,
+    dte_min: Optional[int] = None,
+    dte_max: Optional[int] = None,
+    all_pages: bool = False,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Get a comprehensive snapshot of all options contracts for a specified underlying asset.
+
+    strike_price_gte/strike_price_lte and dte_min/dte_max (days to
+    expiration) narrow the chain on the server. Set all_pages to fetch the
+    whole filtered chain in one call; it is paged through concurrently and
+    briefly cached. With all_pages, sort and order apply to the whole chain
+    and limit caps the number of contracts returned. Greeks and implied
+    volatility missing from Polygon's data are computed locally from the
+    quote midpoint (marked greeks_source "local").
     """
     try:
+        expiration_gte, expiration_lte = dte_bounds(dte_min, dte_max)
+        if all_pages:
+            if expiration_date is not None:
+                expiration_gte = expiration_lte = date.fromisoformat(expiration_date)
+            chain = await fetch_chain(
+                underlying_asset,
+                expiration_gte=expiration_gte,
+                expiration_lte=expiration_lte,
+                strike_gte=strike_price if strike_price is not None else strike_price_gte,
+                strike_lte=strike_price if strike_price is not None else strike_price_lte,
+                contract_type=contract_type,
+                params=params,
+            )
+            contracts = chain["results"]
+            if sort is not None or order is not None:
+                contracts = sort_contracts(contracts, sort, order)
+            if limit is not None and limit < len(contracts):
+                contracts = contracts[:limit]
+                chain = {**chain, "truncated": True}
+            chain = {**chain, "count": len(contracts), "results": contracts}
+            return fill_response_greeks(chain)
+
         # Build params dict with the query parameters
         query_params = {}
         if strike_price is not None:
@@ -34,52 +77,73 @@ async def get_option_chain_snapshot(
             query_params["limit"] = limit
         if sort is not None:
             query_params["sort"] = sort
+        if strike_price_gte is not None:
+            query_params["strike_price.gte"] = strike_price_gte
+        if strike_price_lte is not None:
+            query_params["strike_price.lte"] = strike_price_lte
+        if expiration_gte is not None:
+            query_params["expiration_date.gte"] = expiration_gte.isoformat()
+        if expiration_lte is not None:
+            query_params["expiration_date.lte"] = expiration_lte.isoformat()
         if params:
             query_params.update(params)
 
-        results = polygon_client.list_snapshot_options_chain(
+        results = await fetch(
+            "list_snapshot_options_chain",
             underlying_asset=underlying_asset,
             params=query_params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+        return fill_response_greeks(results)
     except Exception as e:
         return {"error": str(e)}
 
 
 @poly_mcp.tool()
-async def get_option_aggs(
-    options_ticker: str,
-    multiplier: int,
-    timespan: str,
-    from_: Union[str, int, datetime, date],
-    to: Union[str, int, datetime, date],
-    adjusted: Optional[bool] = None,
-    sort: Optional[str] = None,
-    limit: Optional[int] = None,
+async def get_option_chain_analytics(
+    underlying_asset: str,
+    expiration_date: Optional[str] = None,
+    expiration_date_gte: Optional[str] = None,
+    expiration_date_lte: Optional[str] = None,
+    dte_min: Optional[int] = None,
+    dte_max: Optional[int] = None,
+    strike_price_gte: Optional[float] = None,
+    strike_price_lte: Optional[float] = None,
+    underlying_price: Optional[float] = None,
+    max_strikes: Optional[int] = 50,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
-    Get aggregated historical OHLC data for a specified options contract.
+    Summarize the options chain of an underlying asset instead of returning
+    every contract: max pain, call/put open interest, put/call open interest
+    and volume ratios, ATM IV and 25-delta IV skew per expiration, and dealer
+    gamma exposure by strike (the max_strikes strikes nearest the underlying
+    price).
+
+    underlying_price defaults to the price in the chain snapshot.
     """
     try:
-        results = polygon_client.get_aggs(
-            ticker=options_ticker,
-            multiplier=multiplier,
-            timespan=timespan,
-            from_=from_,
-            to=to,
-            adjusted=adjusted,
-            sort=sort,
-            limit=limit,
+        expiration_gte, expiration_lte = dte_bounds(dte_min, dte_max)
+        if expiration_date_gte is not None:
+            expiration_gte = date.fromisoformat(expiration_date_gte)
+        if expiration_date_lte is not None:
+            expiration_lte = date.fromisoformat(expiration_date_lte)
+        if expiration_date is not None:
+            expiration_gte = expiration_lte = date.fromisoformat(expiration_date)
+
+        chain = await fetch_chain(
+            underlying_asset,
+            expiration_gte=expiration_gte,
+            expiration_lte=expiration_lte,
+            strike_gte=strike_price_gte,
+            strike_lte=strike_price_lte,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+        analytics = chain_analytics(
+            fill_greeks(chain["results"]), underlying_price, max_strikes
+        )
+        if chain.get("truncated"):
+            analytics["truncated"] = True
+        return {"underlying_asset": underlying_asset, **analytics}
     except Exception as e:
         return {"error": str(e)}
 
@@ -101,14 +165,11 @@ async def get_option_contract_overview(
         if params:
             query_params.update(params)
 
-        results = polygon_client.get_options_contract(
+        return await fetch_text(
+            "get_options_contract",
             ticker=options_ticker,
             params=query_params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -124,10 +185,14 @@ async def list_option_contracts(
     order: Optional[str] = None,
     limit: Optional[int] = None,
     sort: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    max_rows: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Get a comprehensive index of options contracts with filtering capabilities.
+
+    Set max_pages or max_rows to follow next_url cursors and merge the pages.
     """
     try:
         # Build params dict with the query parameters
@@ -153,13 +218,13 @@ async def list_option_contracts(
         if params:
             query_params.update(params)
 
-        results = polygon_client.list_options_contracts(
+        return await fetch_pages(
+            "list_options_contracts",
+            max_pages=max_pages,
+            max_rows=max_rows,
             params=query_params,
-            raw=True,
+            passthrough=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -172,38 +237,57 @@ async def get_option_contract_snapshot(
 ) -> Dict[str, Any]:
     """
     Get a comprehensive snapshot of a specified options contract.
+
+    Greeks and implied volatility missing from Polygon's data are computed
+    locally from the quote midpoint (marked greeks_source "local").
     """
     try:
-        results = polygon_client.get_snapshot_option(
+        results = await fetch(
+            "get_snapshot_option",
             underlying_asset=underlying_asset,
             option_contract=option_contract,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
+        return fill_response_greeks(results)
     except Exception as e:
         return {"error": str(e)}
 
-@poly_mcp.tool()
-async def get_snapshot_option(
-    underlying_asset: str,
-    option_contract: str,
+
+async def get_option_aggs(
+    options_ticker: str,
+    multiplier: int,
+    timespan: str,
+    from_: Union[str, int, datetime, date],
+    to: Union[str, int, datetime, date],
+    adjusted: Optional[bool] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = None,
     params: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
-    Get snapshot for a specific option contract.
+    Get aggregated historical OHLC data for a specified options contract.
+
+    Deprecated: use get_aggs with the options ticker instead. This tool
+    will be removed in a future release.
     """
-    try:
-        results = polygon_client.get_snapshot_option(
-            underlying_asset=underlying_asset,
-            option_contract=option_contract,
-            params=params,
-            raw=True,
-        )
+    return await get_aggs(
+        ticker=options_ticker,
+        multiplier=multiplier,
+        timespan=timespan,
+        from_=from_,
+        to=to,
+        adjusted=adjusted,
+        sort=sort,
+        limit=limit,
+        params=params,
+    )
 
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
-    except Exception as e:
-        return {"error": str(e)}
+
+if POLYGON_TOOL_ALIASES:
+    poly_mcp.tool()(get_option_aggs)
+    poly_mcp.tool(
+        name="get_snapshot_option",
+        description="Get snapshot for a specific option contract.\n\n"
+        "Deprecated: use get_option_contract_snapshot instead. This tool will "
+        "be removed in a future release.",
+    )(get_option_contract_snapshot)
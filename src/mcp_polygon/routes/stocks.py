@@ -1,7 +1,6 @@
-from mcp_polygon.polygonClient import polygon_client
+from mcp_polygon.upstream import fetch_text
 from typing import Optional, Dict, Any, Union
 from datetime import datetime, date
-import json
 from ..server import poly_mcp
 
 
@@ -33,7 +32,8 @@ async def list_stock_financials(
     Get fundamental financial data for companies.
     """
     try:
-        results = polygon_client.vx.list_stock_financials(
+        return await fetch_text(
+            "vx.list_stock_financials",
             ticker=ticker,
             cik=cik,
             company_name=company_name,
@@ -55,11 +55,7 @@ async def list_stock_financials(
             sort=sort,
             order=order,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -82,7 +78,8 @@ async def list_ipos(
     Retrieve upcoming or historical IPOs.
     """
     try:
-        results = polygon_client.vx.list_ipos(
+        return await fetch_text(
+            "vx.list_ipos",
             ticker=ticker,
             listing_date=listing_date,
             listing_date_lt=listing_date_lt,
@@ -94,11 +91,7 @@ async def list_ipos(
             sort=sort,
             order=order,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -120,7 +113,8 @@ async def list_short_interest(
     Retrieve short interest data for stocks.
     """
     try:
-        results = polygon_client.list_short_interest(
+        return await fetch_text(
+            "list_short_interest",
             ticker=ticker,
             settlement_date=settlement_date,
             settlement_date_lt=settlement_date_lt,
@@ -131,11 +125,7 @@ async def list_short_interest(
             sort=sort,
             order=order,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -157,7 +147,8 @@ async def list_short_volume(
     Retrieve short volume data for stocks.
     """
     try:
-        results = polygon_client.list_short_volume(
+        return await fetch_text(
+            "list_short_volume",
             ticker=ticker,
             date=date,
             date_lt=date_lt,
@@ -168,11 +159,7 @@ async def list_short_volume(
             sort=sort,
             order=order,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -189,17 +176,14 @@ async def list_splits(
     Get historical stock splits.
     """
     try:
-        results = polygon_client.list_splits(
+        return await fetch_text(
+            "list_splits",
             ticker=ticker,
             execution_date=execution_date,
             reverse_split=reverse_split,
             limit=limit,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -217,18 +201,15 @@ async def list_dividends(
     Get historical cash dividends.
     """
     try:
-        results = polygon_client.list_dividends(
+        return await fetch_text(
+            "list_dividends",
             ticker=ticker,
             ex_dividend_date=ex_dividend_date,
             frequency=frequency,
             dividend_type=dividend_type,
             limit=limit,
             params=params,
-            raw=True,
         )
-
-        data_str = results.data.decode("utf-8")
-        return json.loads(data_str)
     except Exception as e:
         return {"error": str(e)}
 
@@ -3,19 +3,51 @@ from mcp.server.fastmcp import FastMCP
 import asyncio
 from dotenv import load_dotenv
 import logging
+import threading
+from contextlib import asynccontextmanager
 
 from mcp.server.auth.provider import AccessToken, TokenVerifier
 from mcp.server.auth.settings import AuthSettings
+from mcp.server.fastmcp.exceptions import ToolError
+from starlette.requests import Request
+from starlette.responses import Response
+
+from mcp_polygon import metrics, tracing
+from mcp_polygon.polygonClient import prewarm_pool
+from mcp_polygon.snapshots import start_snapshot_refresher
+from mcp_polygon.tickerindex import start_ticker_index_refresher
+from mcp_polygon.upstream import POLYGON_STRUCTURED_OUTPUT
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
 LOCAL = os.environ.get("MCP_TRANSPORT", "stdio")
 
+# Also register the deprecated tool names that duplicate another tool
+# (list_aggs, get_option_aggs, get_snapshot_option) for clients that still
+# call them. Set to 0 to keep tools/list small.
+POLYGON_TOOL_ALIASES = os.environ.get("POLYGON_TOOL_ALIASES", "1").lower() in ("1", "true", "yes")
+
+# Processes serving the HTTP transports. Above 1, uvicorn starts that many
+# workers sharing the port, each with its own event loop and caches; one of
+# them runs the background jobs. On SIGHUP uvicorn's supervisor (0.30 and
+# later) stops and replaces the workers one at a time.
+MCP_WORKERS = int(os.environ.get("MCP_WORKERS", "1"))
+# Set by the parent for its workers: the lock file whose holder runs the
+# background jobs.
+MCP_JOBS_LOCK = os.environ.get("MCP_JOBS_LOCK")
+# Seconds between a worker's attempts to take over the background jobs.
+JOBS_LOCK_POLL = 5
+# Seconds a stopping worker waits for requests in flight.
+MCP_GRACEFUL_SHUTDOWN = float(os.environ.get("MCP_GRACEFUL_SHUTDOWN", "30"))
+
 class BearerAuthenticator(TokenVerifier):
     async def verify_token(self, token: str) -> AccessToken | None:
         logger.info(f"Verifying token: {token}")
-        if token == os.environ.get("MCP_TOKEN"):
+        with tracing.span("auth.verify_token") as span:
+            valid = token == os.environ.get("MCP_TOKEN")
+            span.set_attribute("auth.valid", valid)
+        if valid:
             # You must return token, client_id, scopes
             # You can optionally set an expiration timestamp and resource string
             return AccessToken(
@@ -36,7 +68,50 @@ auth_settings = AuthSettings(
     resource_server_url=None,
 )
 
-poly_mcp = FastMCP(
+class PolygonMCP(FastMCP):
+    # With POLYGON_STRUCTURED_OUTPUT off, tools are registered without an
+    # outputSchema and return Polygon's JSON as text only.
+    def tool(self, *args, structured_output: bool | None = None, **kwargs):
+        if structured_output is None and not POLYGON_STRUCTURED_OUTPUT:
+            structured_output = False
+        return super().tool(*args, structured_output=structured_output, **kwargs)
+
+    async def call_tool(self, name, arguments):
+        tool = self._tool_manager.get_tool(name)
+        with (
+            tracing.span(f"tools/call {name}", **{"mcp.tool.name": name}) as span,
+            # Unknown names are counted together to keep label values bounded.
+            metrics.tool_call(name if tool else "unknown") as call,
+        ):
+            try:
+                result = await self._tool_manager.call_tool(
+                    name, arguments, context=self.get_context()
+                )
+            except Exception as e:
+                trace_id = tracing.current_trace_id()
+                if trace_id is None:
+                    raise
+                raise ToolError(f"{e} (trace_id: {trace_id})") from e
+
+            # Tools report failures as {"error": ...} rather than raising.
+            if isinstance(result, dict) and "error" in result:
+                call.fail()
+                tracing.mark_error(span, str(result["error"]))
+                trace_id = tracing.current_trace_id()
+                if trace_id is not None:
+                    result = {**result, "trace_id": trace_id}
+
+            with tracing.span("serialize"):
+                result = tool.fn_metadata.convert_result(result)
+            content = result[0] if isinstance(result, tuple) else result
+            call.response_bytes = sum(
+                len(getattr(c, "text", "").encode("utf-8")) for c in content
+            )
+            span.set_attribute("mcp.response_bytes", call.response_bytes)
+            return result
+
+
+poly_mcp = PolygonMCP(
     "Polygon", 
     instructions="This server provides stock and option data from Polygon.io",
     dependencies=["polygon"], 
@@ -50,17 +125,156 @@ poly_mcp = FastMCP(
 )
 
 
+@poly_mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> Response:
+    # Custom routes bypass the MCP auth middleware. When a token is set,
+    # scrapers must send it as a bearer token like MCP clients do.
+    if os.environ.get("MCP_TOKEN"):
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not await BearerAuthenticator().verify_token(
+            token
+        ):
+            return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def _prewarm():
+    # Warm the upstream connection pool in the background so startup isn't
+    # delayed when Polygon is slow or unreachable.
+    threading.Thread(target=prewarm_pool, name="polygon-prewarm", daemon=True).start()
+
+
+def _start_jobs():
+    return [start_snapshot_refresher(), start_ticker_index_refresher()]
+
+
+def _stop_jobs(jobs):
+    for job in jobs:
+        if job is not None:
+            job.cancel()
+
+
+async def _serve(server):
+    # Background jobs run on the server's event loop and stop with it.
+    jobs = _start_jobs()
+    try:
+        await server
+    finally:
+        _stop_jobs(jobs)
+
+
+def _try_lock(path):
+    # An exclusive lock on the file, released by the OS when the holder
+    # exits. Returns the descriptor, or None if another process holds it.
+    import fcntl
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+async def _jobs_when_elected(path):
+    # Only the worker holding the lock runs the background jobs, so the
+    # snapshot refresher and ticker crawl don't multiply upstream load. The
+    # others keep trying and take over when the holder exits.
+    while (fd := _try_lock(path)) is None:
+        await asyncio.sleep(JOBS_LOCK_POLL)
+    logger.info(f"Worker {os.getpid()} runs the background jobs")
+    jobs = _start_jobs()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        _stop_jobs(jobs)
+        os.close(fd)
+
+
+def _with_background_jobs(app):
+    # In worker mode each worker builds its own app, so the connection pool
+    # and background jobs are started from the app's lifespan.
+    lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def lifespan_with_jobs(app):
+        _prewarm()
+        if MCP_JOBS_LOCK:
+            # Every worker answers scrapes of its own metrics; label them so
+            # each worker's counters form series of their own.
+            metrics.const_labels = (("worker", str(os.getpid())),)
+            jobs = [asyncio.ensure_future(_jobs_when_elected(MCP_JOBS_LOCK))]
+        else:
+            jobs = _start_jobs()
+        try:
+            async with lifespan(app) as state:
+                yield state
+        finally:
+            _stop_jobs(jobs)
+
+    app.router.lifespan_context = lifespan_with_jobs
+    return app
+
+
+def create_streamable_http_app():
+    """
+    App factory for a worker serving the Streamable HTTP transport.
+    """
+    return _with_background_jobs(poly_mcp.streamable_http_app())
+
+
+def create_sse_app():
+    """
+    App factory for a worker serving the SSE transport.
+    """
+    return _with_background_jobs(poly_mcp.sse_app('/sse'))
+
+
+def _run_workers(factory):
+    import tempfile
+
+    import uvicorn
+
+    # Workers are spawned with this environment. They take an equal share
+    # of POLYGON_RATE_LIMIT (see ratelimit.py) and elect one of them to run
+    # the background jobs through the lock file.
+    fd, lock = tempfile.mkstemp(prefix="mcp_polygon-jobs-", suffix=".lock")
+    os.close(fd)
+    os.environ["MCP_JOBS_LOCK"] = lock
+    os.environ.setdefault("MCP_WORKER_RATE_SHARE", str(MCP_WORKERS))
+    try:
+        uvicorn.run(
+            f"mcp_polygon.server:{factory.__name__}",
+            factory=True,
+            workers=MCP_WORKERS,
+            host=poly_mcp.settings.host,
+            port=poly_mcp.settings.port,
+            log_level=poly_mcp.settings.log_level.lower(),
+            timeout_graceful_shutdown=MCP_GRACEFUL_SHUTDOWN,
+        )
+    finally:
+        os.unlink(lock)
+
+
 def run_stdio():
-    asyncio.run(poly_mcp.run_stdio_async())
+    _prewarm()
+    asyncio.run(_serve(poly_mcp.run_stdio_async()))
 
 
 def run_web():
     transport = os.environ.get("MCP_TRANSPORT", "streamable-http").lower()
 
+    if transport not in ("sse", "streamable-http"):
+        logger.error(f"Unknown MCP_TRANSPORT value: {transport}. Must be 'sse', 'streamable-http', or 'both'.")
+        raise ValueError(f"Unknown MCP_TRANSPORT value: {transport}")
+
+    if MCP_WORKERS > 1:
+        _run_workers(create_sse_app if transport == "sse" else create_streamable_http_app)
+        return
+
+    _prewarm()
     if transport == "sse":
-        asyncio.run(poly_mcp.run_sse_async('/sse'))
-    elif transport == "streamable-http":
-        asyncio.run(poly_mcp.run_streamable_http_async())
+        asyncio.run(_serve(poly_mcp.run_sse_async('/sse')))
     else:
-        logger.error(f"Unknown MCP_TRANSPORT value: {transport}. Must be 'sse', 'streamable-http', or 'both'.")
-        raise ValueError(f"Unknown MCP_TRANSPORT value: {transport}")
\ No newline at end of file
+        asyncio.run(_serve(poly_mcp.run_streamable_http_async()))
@@ -0,0 +1,138 @@
+import asyncio
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from mcp_polygon.fastjson import loads
+from mcp_polygon.polygonClient import polygon_client
+from mcp_polygon.resilience import call_with_retries
+from mcp_polygon.upstream import run_blocking
+
+# Seconds between refreshes of the full-market stocks snapshot. 0 disables
+# the refresher and every snapshot tool call goes to Polygon.
+POLYGON_SNAPSHOT_REFRESH = float(os.environ.get("POLYGON_SNAPSHOT_REFRESH", "0"))
+# Oldest snapshot, in seconds, that tools are answered from. Past this the
+# tools fall back to Polygon until a refresh succeeds again.
+POLYGON_SNAPSHOT_MAX_AGE = float(
+    os.environ.get("POLYGON_SNAPSHOT_MAX_AGE", str(3 * POLYGON_SNAPSHOT_REFRESH))
+)
+
+# Polygon only ranks tickers with at least this much volume as gainers or
+# losers, and returns the top 20.
+DIRECTION_MIN_VOLUME = 10_000
+DIRECTION_SIZE = 20
+
+
+class SnapshotTable:
+    """
+    Full-market stocks snapshot indexed by ticker, with the gainers and
+    losers precomputed. Tables are immutable once built; a refresh swaps in
+    a new one.
+    """
+
+    def __init__(self, response: Dict[str, Any], fetched_at: float):
+        self.fetched_at = fetched_at
+        self.rows: List[Dict[str, Any]] = response.get("tickers") or []
+        self.by_ticker = {row.get("ticker"): row for row in self.rows}
+
+        ranked = sorted(
+            (
+                row
+                for row in self.rows
+                if (row.get("day") or {}).get("v", 0) >= DIRECTION_MIN_VOLUME
+                and row.get("todaysChangePerc") is not None
+            ),
+            key=lambda row: row["todaysChangePerc"],
+        )
+        self.directions = {
+            "gainers": ranked[::-1][:DIRECTION_SIZE],
+            "losers": ranked[:DIRECTION_SIZE],
+        }
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def _response(self, **fields: Any) -> Dict[str, Any]:
+        return {
+            "status": "OK",
+            **fields,
+            "snapshot_cache": {
+                "fetched_at": int(self.fetched_at * 1000),
+                "age_seconds": round(self.age, 3),
+            },
+        }
+
+    def all(self, tickers: Optional[List[str]] = None) -> Dict[str, Any]:
+        if tickers is None:
+            rows = self.rows
+        else:
+            rows = [self.by_ticker[t] for t in tickers if t in self.by_ticker]
+        return self._response(count=len(rows), tickers=rows)
+
+    def ticker(self, ticker: str) -> Optional[Dict[str, Any]]:
+        row = self.by_ticker.get(ticker)
+        return None if row is None else self._response(ticker=row)
+
+    def direction(self, direction: str) -> Optional[Dict[str, Any]]:
+        rows = self.directions.get(direction)
+        return None if rows is None else self._response(tickers=rows)
+
+
+_table: Optional[SnapshotTable] = None
+
+
+def snapshot_table(
+    market_type: str,
+    include_otc: Optional[bool] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> Optional[SnapshotTable]:
+    """
+    The refreshed snapshot if it can answer a request with these arguments
+    and is recent enough, otherwise None.
+    """
+    if _table is None or market_type != "stocks" or include_otc or params:
+        return None
+    if _table.age > POLYGON_SNAPSHOT_MAX_AGE:
+        return None
+    return _table
+
+
+def _load_table() -> SnapshotTable:
+    # Decoding and indexing the full market takes long enough that it runs
+    # on the worker pool rather than the event loop.
+    fetched_at = time.time()
+    response = polygon_client.get_snapshot_all("stocks", raw=True)
+    return SnapshotTable(loads(response.data), fetched_at)
+
+
+async def refresh_snapshot() -> None:
+    global _table
+
+    _table = await call_with_retries(
+        "get_snapshot_all", lambda: run_blocking(_load_table)
+    )
+
+
+async def _refresh_forever(interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        try:
+            await refresh_snapshot()
+        except Exception as e:
+            print(f"Warning: snapshot refresh failed: {e}", file=sys.stderr)
+        await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+
+def start_snapshot_refresher(
+    interval: float = POLYGON_SNAPSHOT_REFRESH,
+) -> Optional["asyncio.Task[None]"]:
+    """
+    Start refreshing the snapshot every ``interval`` seconds on the running
+    event loop. Returns the task, or None when refreshing is disabled.
+    """
+    if interval <= 0:
+        return None
+    return asyncio.ensure_future(_refresh_forever(interval))
@@ -0,0 +1,266 @@
+import asyncio
+import os
+import re
+import sys
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from mcp_polygon.upstream import fetch, fetch_next, run_blocking
+
+# Seconds between crawls of the full ticker list. 0 disables the local
+# index and list_tickers always goes to Polygon.
+POLYGON_TICKER_INDEX_REFRESH = float(
+    os.environ.get("POLYGON_TICKER_INDEX_REFRESH", "0")
+)
+# Markets included in the index, as accepted by list_tickers(market=...).
+POLYGON_TICKER_INDEX_MARKETS = tuple(
+    market.strip()
+    for market in os.environ.get(
+        "POLYGON_TICKER_INDEX_MARKETS", "stocks,otc,crypto,fx,indices"
+    ).split(",")
+    if market.strip()
+)
+
+# Smallest share of trigrams a name must have in common with the query to
+# count as a fuzzy match.
+FUZZY_THRESHOLD = 0.3
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    return _NON_ALNUM.sub(" ", text.lower()).strip()
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _prefixed(keys: List[str], prefix: str) -> Iterable[int]:
+    """
+    Positions of the sorted ``keys`` that start with ``prefix``.
+    """
+    i = bisect_left(keys, prefix)
+    while i < len(keys) and keys[i].startswith(prefix):
+        yield i
+        i += 1
+
+
+class TickerIndex:
+    """
+    Active tickers of a set of markets, searchable by symbol prefix, name
+    word prefix and trigram similarity, and indexed by CIK. Built once per
+    crawl and read-only afterwards.
+    """
+
+    def __init__(
+        self, rows: List[Dict[str, Any]], markets: Iterable[str], fetched_at: float
+    ):
+        self.rows = rows
+        self.markets = frozenset(markets)
+        self.fetched_at = fetched_at
+
+        symbols = sorted((row["ticker"].upper(), i) for i, row in enumerate(rows))
+        self._symbol_keys = [symbol for symbol, _ in symbols]
+        self._symbol_rows = [i for _, i in symbols]
+
+        words: List[Tuple[str, int]] = []
+        self._names: List[str] = []
+        self._trigram_rows: Dict[str, List[int]] = defaultdict(list)
+        self._by_cik: Dict[str, List[int]] = defaultdict(list)
+        for i, row in enumerate(rows):
+            name = _normalize(row.get("name") or "")
+            self._names.append(name)
+            words.extend((word, i) for word in set(name.split()))
+            for gram in _trigrams(name):
+                self._trigram_rows[gram].append(i)
+            if row.get("cik"):
+                self._by_cik[row["cik"].lstrip("0")].append(i)
+        words.sort()
+        self._word_keys = [word for word, _ in words]
+        self._word_rows = [i for _, i in words]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def ticker(self, symbol: str) -> List[int]:
+        symbol = symbol.upper()
+        i = bisect_left(self._symbol_keys, symbol)
+        if i < len(self._symbol_keys) and self._symbol_keys[i] == symbol:
+            return [self._symbol_rows[i]]
+        return []
+
+    def cik(self, cik: str) -> List[int]:
+        return list(self._by_cik.get(cik.lstrip("0"), ()))
+
+    def search(self, query: str) -> List[int]:
+        """
+        Rows matching ``query``, best first: the exact symbol, symbols
+        starting with it, names with a word starting with every query word,
+        then names that are merely similar.
+        """
+        scores: Dict[int, float] = {}
+        symbol = query.strip().upper()
+        if symbol:
+            for pos in _prefixed(self._symbol_keys, symbol):
+                row = self._symbol_rows[pos]
+                exact = self._symbol_keys[pos] == symbol
+                scores[row] = 4.0 if exact else 3.0 - len(self._symbol_keys[pos]) / 100
+
+        text = _normalize(query)
+        if text:
+            matches: Optional[Set[int]] = None
+            for word in text.split():
+                rows = {
+                    self._word_rows[pos] for pos in _prefixed(self._word_keys, word)
+                }
+                matches = rows if matches is None else matches & rows
+            for row in matches or ():
+                prefix = self._names[row].startswith(text)
+                scores.setdefault(row, 2.5 if prefix else 2.0)
+
+            if not scores:
+                grams = _trigrams(text)
+                shared: Dict[int, int] = defaultdict(int)
+                for gram in grams:
+                    for row in self._trigram_rows.get(gram, ()):
+                        shared[row] += 1
+                for row, count in shared.items():
+                    similarity = count / (
+                        len(grams) + len(self._names[row]) + 1 - count
+                    )
+                    if similarity >= FUZZY_THRESHOLD:
+                        scores[row] = similarity
+        return sorted(scores, key=lambda row: (-scores[row], self.rows[row]["ticker"]))
+
+    def query(
+        self,
+        ticker: Optional[str] = None,
+        type: Optional[str] = None,
+        market: Optional[str] = None,
+        exchange: Optional[str] = None,
+        cik: Optional[str] = None,
+        search: Optional[str] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Answer a list_tickers query. Results are ranked by relevance when
+        searching and sorted by ticker otherwise, unless ``sort`` is given.
+        ``matches`` counts every matching row; ``truncated`` is set when
+        ``limit`` cut some of them off.
+        """
+        if ticker is not None:
+            candidates = self.ticker(ticker)
+        elif cik is not None:
+            candidates = self.cik(cik)
+        elif search:
+            candidates = self.search(search)
+        else:
+            candidates = self._symbol_rows
+        if cik is not None and ticker is not None:
+            candidates = [i for i in candidates if i in self.cik(cik)]
+        if search and (ticker is not None or cik is not None):
+            matched = set(self.search(search))
+            candidates = [i for i in candidates if i in matched]
+
+        rows = [
+            self.rows[i]
+            for i in candidates
+            if (type is None or self.rows[i].get("type") == type)
+            and (market is None or self.rows[i].get("market") == market)
+            and (exchange is None or self.rows[i].get("primary_exchange") == exchange)
+        ]
+        if sort:
+            present = [row for row in rows if row.get(sort) is not None]
+            present.sort(key=lambda row: row[sort], reverse=order == "desc")
+            rows = present + [row for row in rows if row.get(sort) is None]
+        elif order == "desc" and not search:
+            rows.reverse()
+
+        matches = len(rows)
+        rows = rows[: min(limit or 100, 1000)]
+        return {
+            "status": "OK",
+            "count": len(rows),
+            "matches": matches,
+            "truncated": matches > len(rows),
+            "results": rows,
+            "ticker_index": {
+                "fetched_at": int(self.fetched_at * 1000),
+                "age_seconds": round(self.age, 3),
+            },
+        }
+
+
+_index: Optional[TickerIndex] = None
+
+
+def ticker_index(
+    market: Optional[str] = None,
+    cusip: Optional[str] = None,
+    date: Any = None,
+    active: Optional[bool] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> Optional[TickerIndex]:
+    """
+    The local index if it can answer a list_tickers query with these
+    arguments, otherwise None. CUSIPs aren't part of list_tickers results,
+    so CUSIP lookups always go to Polygon, as do point-in-time and inactive
+    queries.
+    """
+    if _index is None or cusip or date or params or active is False:
+        return None
+    if market is None:
+        if not _index.markets >= {"stocks", "otc", "crypto", "fx", "indices"}:
+            return None
+    elif market not in _index.markets:
+        return None
+    return _index
+
+
+async def _crawl_market(market: str) -> List[Dict[str, Any]]:
+    page = await fetch("list_tickers", market=market, active=True, limit=1000)
+    rows = list(page.get("results") or [])
+    next_url = page.get("next_url")
+    while next_url:
+        page = await fetch_next(next_url, "list_tickers")
+        rows.extend(page.get("results") or [])
+        next_url = page.get("next_url")
+    return rows
+
+
+async def refresh_ticker_index(
+    markets: Tuple[str, ...] = POLYGON_TICKER_INDEX_MARKETS,
+) -> None:
+    global _index
+    fetched_at = time.time()
+    pages = await asyncio.gather(*(_crawl_market(market) for market in markets))
+    rows = [row for market_rows in pages for row in market_rows]
+    _index = await run_blocking(TickerIndex, rows, markets, fetched_at)
+
+
+async def _refresh_forever(interval: float) -> None:
+    while True:
+        try:
+            await refresh_ticker_index()
+        except Exception as e:
+            print(f"Warning: ticker index refresh failed: {e}", file=sys.stderr)
+        await asyncio.sleep(interval)
+
+
+def start_ticker_index_refresher(
+    interval: float = POLYGON_TICKER_INDEX_REFRESH,
+) -> Optional["asyncio.Task[None]"]:
+    """
+    Crawl the ticker list now and every ``interval`` seconds on the running
+    event loop. Returns the task, or None when the index is disabled.
+    """
+    if interval <= 0:
+        return None
+    return asyncio.ensure_future(_refresh_forever(interval))
@@ -0,0 +1,89 @@
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+# OpenTelemetry is optional (pip install "mcp_polygon[tracing]"). Without
+# it, or without an OTLP endpoint configured, spans are no-ops.
+try:
+    from opentelemetry import trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:
+    trace = None
+
+# Spans are exported over OTLP/HTTP when an endpoint is set, e.g.
+# OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318. The exporter reads the
+# other standard OTEL_* variables itself.
+OTEL_EXPORTER_OTLP_ENDPOINT = os.environ.get(
+    "OTEL_EXPORTER_OTLP_TRACES_ENDPOINT"
+) or os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+OTEL_SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "mcp-polygon")
+
+
+def _configure() -> None:
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        print(f"Warning: tracing unavailable ({e}).", file=sys.stderr)
+        return
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": OTEL_SERVICE_NAME})
+    )
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+
+
+if trace is not None and OTEL_EXPORTER_OTLP_ENDPOINT:
+    _configure()
+
+_tracer = trace.get_tracer("mcp_polygon") if trace is not None else None
+
+
+class _NoopSpan:
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Run the enclosed block in a span that is a child of the current one.
+    Exceptions are recorded on the span. ``None`` attributes are left out.
+    """
+    if _tracer is None:
+        yield _NOOP_SPAN
+        return
+    attributes = {k: v for k, v in attributes.items() if v is not None}
+    with _tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+
+def mark_error(current: Any, description: str) -> None:
+    """
+    Flag a span whose operation failed without raising.
+    """
+    if trace is not None and not isinstance(current, _NoopSpan):
+        current.set_status(Status(StatusCode.ERROR, description))
+
+
+def current_trace_id() -> Optional[str]:
+    """
+    Hex ID of the trace being recorded, or None when not tracing.
+    """
+    if trace is None:
+        return None
+    context = trace.get_current_span().get_span_context()
+    if not context.is_valid or not context.trace_flags.sampled:
+        return None
+    return trace.format_trace_id(context.trace_id)
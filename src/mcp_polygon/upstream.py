@@ -0,0 +1,178 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from operator import attrgetter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+from urllib.parse import urlparse
+
+from mcp_polygon.cache import CACHE_TTLS, TTLCache, make_key
+from mcp_polygon.fastjson import loads
+from mcp_polygon.metrics import upstream_request, upstream_wait, watch_cache
+from mcp_polygon.polygonClient import polygon_client
+from mcp_polygon.resilience import call_with_retries, current_deadline
+from mcp_polygon.tracing import span
+
+T = TypeVar("T")
+
+# The Polygon SDK is synchronous (urllib3), so every upstream call is handed
+# to a bounded worker pool instead of blocking the event loop that serves all
+# MCP sessions.
+POLYGON_MAX_WORKERS = int(os.environ.get("POLYGON_MAX_WORKERS", "32"))
+
+executor = ThreadPoolExecutor(
+    max_workers=POLYGON_MAX_WORKERS, thread_name_prefix="polygon"
+)
+
+# Responses of the methods listed in cache.CACHE_TTLS are kept in memory up to
+# this many bytes of upstream JSON. Set to 0 to disable caching.
+POLYGON_CACHE_MAX_BYTES = int(
+    os.environ.get("POLYGON_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+)
+
+response_cache = TTLCache(max_bytes=POLYGON_CACHE_MAX_BYTES)
+watch_cache("response", response_cache)
+
+# MCP structured output repeats every tool result as a JSON object next to
+# its text, as declared by each tool's outputSchema. Turning it off drops
+# both, which lets tools forward Polygon's response body as their text
+# content without decoding and re-encoding it.
+POLYGON_STRUCTURED_OUTPUT = os.environ.get("POLYGON_STRUCTURED_OUTPUT", "1").lower() in ("1", "true", "yes")
+
+
+async def run_blocking(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking callable on the upstream worker pool.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+
+class Body:
+    """
+    Upstream response body, shared by coalesced callers and the response
+    cache. It is decoded at most once, when a caller first needs the JSON.
+    """
+
+    __slots__ = ("data", "_json")
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self._json: Optional[Dict[str, Any]] = None
+
+    def json(self) -> Dict[str, Any]:
+        if self._json is None:
+            with span("json.parse", **{"json.bytes": len(self.data)}):
+                self._json = loads(self.data)
+        return self._json
+
+    def text(self) -> str:
+        return self.data.decode("utf-8")
+
+
+# Upstream requests currently in flight, keyed like the response cache.
+# Identical concurrent calls await the same task instead of each making a
+# request of their own.
+_inflight: Dict[Hashable, "asyncio.Task[Body]"] = {}
+
+
+async def _single_flight(key: Hashable, request: Callable[[], Awaitable[Body]]) -> Body:
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(request())
+        _inflight[key] = task
+
+        def forget(done: "asyncio.Task[Body]") -> None:
+            if _inflight.get(key) is done:
+                del _inflight[key]
+
+        task.add_done_callback(forget)
+    # Shielded so a caller that is cancelled doesn't cancel the request for
+    # the others waiting on it.
+    return await asyncio.shield(task)
+
+
+async def _fetch_body(method: str, kwargs: Dict[str, Any]) -> Body:
+    key = make_key(method, kwargs)
+    ttl = CACHE_TTLS.get(method)
+    if ttl:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached
+
+    func = attrgetter(method)(polygon_client)
+    deadline = current_deadline()
+
+    async def send() -> Any:
+        attributes = {"polygon.method": method, "polygon.page": 1}
+        with span(f"polygon {method}", **attributes), upstream_request(method):
+            return await run_blocking(func, raw=True, **kwargs)
+
+    async def request() -> Body:
+        results = await call_with_retries(method, send, deadline)
+        body = Body(results.data)
+        if ttl:
+            response_cache.set(key, body, ttl, len(body.data))
+        return body
+
+    with upstream_wait():
+        return await _single_flight(key, request)
+
+
+async def fetch(method: str, /, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Call ``polygon_client.<method>`` without blocking the event loop and
+    return the decoded JSON body.
+
+    ``method`` may be dotted, e.g. ``"vx.list_stock_financials"``. Methods
+    with an entry in ``CACHE_TTLS`` are served from ``response_cache`` while
+    fresh. Concurrent calls with the same arguments share one request and
+    one decoded body, so the result must be treated as read-only.
+    Transient failures are retried within the MCP request's deadline; see
+    ``resilience.call_with_retries``.
+    """
+    return (await _fetch_body(method, kwargs)).json()
+
+
+async def fetch_text(method: str, /, **kwargs: Any) -> Any:
+    """
+    Like ``fetch``, for tools that return the response unchanged. With
+    ``POLYGON_STRUCTURED_OUTPUT`` off, the body is passed through as the
+    JSON text Polygon sent, skipping the decode and re-encode; otherwise the
+    tool result has to match the tool's outputSchema, so the decoded body is
+    returned as with ``fetch``.
+    """
+    body = await _fetch_body(method, kwargs)
+    return body.json() if POLYGON_STRUCTURED_OUTPUT else body.text()
+
+
+async def fetch_next(
+    next_url: str, method: Optional[str] = None, page: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Follow the ``next_url`` cursor of a paginated response. ``method`` is
+    the polygon_client method that returned the first page, which sets the
+    request's scheduling priority; ``page`` is this page's number, counting
+    the first as 1, for tracing.
+    """
+    parsed = urlparse(next_url)
+    path = parsed.path
+    if parsed.query:
+        path += "?" + parsed.query
+
+    deadline = current_deadline()
+
+    async def send() -> Any:
+        attributes = {"polygon.method": method, "polygon.page": page}
+        with span(f"polygon {method or 'next_url'}", **attributes), upstream_request(
+            method
+        ):
+            return await run_blocking(polygon_client._get, path=path, raw=True)
+
+    async def request() -> Body:
+        results = await call_with_retries(method, send, deadline)
+        return Body(results.data)
+
+    with upstream_wait():
+        body = await _single_flight(next_url, request)
+    return body.json()
@@ -0,0 +1,6 @@
+import os
+
+# Importing mcp_polygon builds the Polygon client; keep it quiet and away
+# from the real API.
+os.environ.setdefault("POLYGON_API_KEY", "test")
+os.environ.setdefault("POLYGON_BASE_URL", "http://127.0.0.1:9")
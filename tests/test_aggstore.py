@@ -0,0 +1,177 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from mcp_polygon import aggstore
+from mcp_polygon.aggstore import AggregateStore, IntervalSet, fetch_aggs
+from mcp_polygon.polygonClient import POLYGON_BASE_URL
+
+
+def intervals(s: IntervalSet):
+    return s.intersection(-(10**9), 10**9)
+
+
+def test_add_merges_overlapping_and_adjacent_intervals():
+    s = IntervalSet()
+    s.add(1, 3)
+    s.add(10, 12)
+    s.add(4, 6)
+    assert intervals(s) == [(1, 6), (10, 12)]
+    s.add(5, 11)
+    assert intervals(s) == [(1, 12)]
+
+
+def test_discard_splits_an_interval():
+    s = IntervalSet()
+    s.add(1, 5)
+    s.discard(3)
+    assert intervals(s) == [(1, 2), (4, 5)]
+    s.discard(1)
+    s.discard(9)
+    assert intervals(s) == [(2, 2), (4, 5)]
+
+
+def test_intersection_clips_to_the_range():
+    s = IntervalSet()
+    s.add(1, 5)
+    s.add(8, 9)
+    assert s.intersection(4, 8) == [(4, 5), (8, 8)]
+    assert s.intersection(6, 7) == []
+
+
+DAY_MS = 24 * 3600 * 1000
+STEP_MS = {"minute": 60 * 1000, "hour": 3600 * 1000, "day": DAY_MS}
+
+
+class Requests(list):
+    # Polygon returns at most this many bars per page, with a cursor.
+    page_size = 50000
+
+
+@pytest.fixture
+def polygon(monkeypatch):
+    monkeypatch.setattr(aggstore, "aggregate_store", AggregateStore(":memory:"))
+    # Days count as settled as soon as they end.
+    monkeypatch.setattr(aggstore, "SETTLE_TIME", timedelta(0))
+    requests = Requests()
+
+    def page(from_, to, step):
+        bars = [{"t": t, "c": 1.0} for t in range(from_, to, step)]
+        response = {
+            "queryCount": min(len(bars), requests.page_size),
+            "results": bars[: requests.page_size],
+            "status": "OK",
+            "request_id": f"r{len(requests)}",
+        }
+        if len(bars) > requests.page_size:
+            response["next_url"] = f"{bars[requests.page_size]['t']}/{to}/{step}"
+        return response
+
+    async def fetch(method, /, *, timespan, multiplier, from_, to, **kwargs):
+        requests.append((from_, to))
+        return page(from_, to, STEP_MS[timespan] * multiplier)
+
+    async def fetch_next(next_url, method, page_number):
+        return page(*map(int, next_url.split("/")))
+
+    monkeypatch.setattr(aggstore, "fetch", fetch)
+    monkeypatch.setattr(aggstore, "fetch_next", fetch_next)
+    return requests
+
+
+def get_daily(first, last, **kwargs):
+    return asyncio.run(
+        fetch_aggs(
+            "get_aggs",
+            ticker="X:BTCUSD",
+            multiplier=1,
+            timespan=kwargs.pop("timespan", "day"),
+            from_=first.isoformat(),
+            to=last.isoformat(),
+            **kwargs,
+        )
+    )
+
+
+def test_only_settled_days_are_stored(polygon):
+    today = datetime.now(timezone.utc).date()
+    first = today - timedelta(days=3)
+
+    response = get_daily(first, today)
+    assert len(polygon) == 1
+    assert response["resultsCount"] == response["queryCount"] == 4
+    assert response["request_id"] == "r1"
+    assert response["agg_cache"] == {"days": 4, "stored_days": 0}
+
+    # Today hasn't ended, so it is the only day requested again.
+    response = get_daily(first, today)
+    assert len(polygon) == 2
+    start = datetime.fromtimestamp(polygon[1][0] / 1000, timezone.utc)
+    assert start.date() == today
+    assert response["resultsCount"] == response["queryCount"] == 4
+    assert response["request_id"] == "r2"
+    assert response["agg_cache"] == {"days": 4, "stored_days": 3}
+
+
+def test_stored_range_makes_no_request(polygon):
+    today = datetime.now(timezone.utc).date()
+    first, last = today - timedelta(days=5), today - timedelta(days=2)
+    get_daily(first, last)
+
+    response = get_daily(first, last)
+    assert len(polygon) == 1
+    assert response["queryCount"] == 4
+    assert "request_id" not in response
+    assert "next_url" not in response
+    assert response["agg_cache"] == {"days": 4, "stored_days": 4}
+
+
+def test_truncated_runs_are_followed_to_the_end(polygon):
+    polygon.page_size = 3
+    first, last = date(2024, 1, 1), date(2024, 1, 10)
+
+    response = get_daily(first, last)
+    assert response["resultsCount"] == 10
+    assert len(polygon) == 1
+
+    # Every day was stored complete.
+    response = get_daily(first, last)
+    assert response["resultsCount"] == 10
+    assert response["agg_cache"] == {"days": 10, "stored_days": 10}
+    assert len(polygon) == 1
+
+
+def test_limit_only_fetches_the_days_it_needs(polygon):
+    first, last = date(2024, 1, 1), date(2024, 1, 10)
+
+    response = get_daily(first, last, sort="desc", limit=2)
+    assert [bar["t"] for bar in response["results"]] == [
+        aggstore._day_bounds(day, timezone.utc)[0]
+        for day in (last, last - timedelta(days=1))
+    ]
+    [(from_, to)] = polygon
+    assert from_ == aggstore._day_bounds(date(2024, 1, 9), timezone.utc)[0]
+    assert to == aggstore._day_bounds(last, timezone.utc)[1]
+    start = aggstore._day_bounds(first, timezone.utc)[0]
+    edge = response["results"][-1]["t"]
+    assert response["next_url"].startswith(
+        f"{POLYGON_BASE_URL}/v2/aggs/ticker/X:BTCUSD/range/1/day/{start}/{edge - 1}?"
+    )
+
+
+def test_default_limit_matches_polygon(polygon):
+    first, last = date(2024, 1, 1), date(2024, 3, 31)
+
+    response = get_daily(first, last, timespan="minute")
+    assert response["resultsCount"] == aggstore.DEFAULT_LIMIT
+    assert "next_url" in response
+    assert response["agg_cache"]["days"] < 91
+
+
+def test_runs_are_sized_by_base_aggregates(polygon):
+    first, last = date(2024, 1, 1), date(2024, 4, 9)
+
+    get_daily(first, last, timespan="hour", limit=50000)
+    # 1,440 minute bases a day fit 34 days in a request.
+    assert len(polygon) == 3
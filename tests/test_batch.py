@@ -0,0 +1,30 @@
+import asyncio
+
+from mcp_polygon import batch
+from mcp_polygon.batch import fetch_batch_snapshot
+
+
+def test_empty_snapshot_batch_makes_no_request(monkeypatch):
+    requests = []
+
+    async def fetch(method, /, **kwargs):
+        requests.append(kwargs)
+        return {"tickers": []}
+
+    monkeypatch.setattr(batch, "fetch", fetch)
+    response = asyncio.run(fetch_batch_snapshot("get_last_trade", []))
+    assert response == {"status": "OK", "results": [], "resultsCount": 0}
+    assert requests == []
+
+
+def test_snapshot_batch_reports_missing_tickers(monkeypatch):
+    async def fetch(method, /, **kwargs):
+        assert kwargs["tickers"] == ["AAPL", "ZZZZ"]
+        return {"tickers": [{"ticker": "AAPL", "lastTrade": {"p": 190.5}}]}
+
+    monkeypatch.setattr(batch, "fetch", fetch)
+    response = asyncio.run(
+        fetch_batch_snapshot("get_last_trade", ["AAPL", "ZZZZ", "AAPL"])
+    )
+    assert response["results"] == [{"T": "AAPL", "p": 190.5}]
+    assert response["errors"] == {"ZZZZ": "No results"}
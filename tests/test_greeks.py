@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from mcp_polygon.greeks import (
+    bs_price,
+    fill_greeks,
+    greeks,
+    implied_volatility,
+    norm_cdf,
+)
+
+# Hull's textbook case: S=K=100, one year, r=5%, no dividends, 20% vol.
+S, K, T, R, Q, VOL = 100.0, 100.0, 1.0, 0.05, 0.0, 0.2
+
+
+def test_norm_cdf_scalar_and_array():
+    assert norm_cdf(0.0) == pytest.approx(0.5)
+    assert norm_cdf(1.96) == pytest.approx(0.9750021, abs=1e-7)
+    np.testing.assert_allclose(
+        norm_cdf(np.array([-1.0, 1.0])), [0.1586553, 0.8413447], atol=1e-7
+    )
+
+
+def test_bs_price_scalars():
+    assert float(bs_price(S, K, T, R, Q, VOL, True)) == pytest.approx(10.4506, abs=1e-4)
+    assert float(bs_price(S, K, T, R, Q, VOL, False)) == pytest.approx(5.5735, abs=1e-4)
+
+
+def test_put_call_parity():
+    strikes = np.array([80.0, 100.0, 120.0])
+    call = bs_price(S, strikes, T, R, Q, VOL, True)
+    put = bs_price(S, strikes, T, R, Q, VOL, False)
+    np.testing.assert_allclose(call - put, S - strikes * np.exp(-R * T))
+
+
+def test_atm_greeks():
+    call = greeks(S, K, T, R, Q, VOL, True)
+    put = greeks(S, K, T, R, Q, VOL, False)
+    assert float(call["delta"]) == pytest.approx(0.6368, abs=1e-4)
+    assert float(put["delta"]) == pytest.approx(-0.3632, abs=1e-4)
+    assert float(call["gamma"]) == pytest.approx(0.018762, abs=1e-6)
+    assert float(call["vega"]) == pytest.approx(0.37524, abs=1e-5)
+    assert float(call["theta"]) == pytest.approx(-6.4140 / 365, abs=1e-5)
+    assert float(put["theta"]) == pytest.approx(-1.6579 / 365, abs=1e-5)
+
+
+def test_implied_volatility_round_trip():
+    strikes = np.array([50.0, 90.0, 100.0, 110.0, 200.0])
+    vols = np.array([0.8, 0.25, 0.2, 0.35, 1.2])
+    is_call = np.array([False, True, True, False, True])
+    prices = bs_price(S, strikes, T, R, Q, vols, is_call)
+    solved = implied_volatility(prices, S, strikes, T, R, Q, is_call)
+    np.testing.assert_allclose(solved, vols, rtol=1e-6)
+
+
+def test_implied_volatility_outside_bounds_is_nan():
+    # Below intrinsic value and above the spot price.
+    solved = implied_volatility([5.0, 150.0], S, [90.0, 100.0], T, R, Q, [True, True])
+    assert np.isnan(solved).all()
+
+
+def test_fill_greeks_only_fills_missing():
+    complete = {"greeks": {"delta": 0.5}, "implied_volatility": 0.3}
+    missing = {
+        "details": {
+            "strike_price": 100,
+            "expiration_date": (date.today() + timedelta(days=30)).isoformat(),
+            "contract_type": "call",
+        },
+        "underlying_asset": {"price": 100},
+        "last_quote": {"bid": 3.9, "ask": 4.1},
+    }
+    filled = fill_greeks([complete, missing])
+    assert filled[0] is complete
+    assert filled[1]["greeks_source"] == "local"
+    assert 0 < filled[1]["greeks"]["delta"] < 1
+    assert "greeks" not in missing
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from mcp_polygon import optionchain
+from mcp_polygon.cache import TTLCache
+from mcp_polygon.optionchain import fetch_chain, sort_contracts
+
+
+def contract(ticker, expiration, strike):
+    return {
+        "details": {
+            "ticker": ticker,
+            "expiration_date": expiration,
+            "strike_price": strike,
+        }
+    }
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    monkeypatch.setattr(optionchain, "chain_cache", TTLCache(max_bytes=1 << 20))
+    monkeypatch.setattr(optionchain, "trading_day", lambda: date(2025, 6, 16))
+    return []
+
+
+def fake_pages(requests, pages_needed):
+    async def fetch_pages(method, /, *, underlying_asset, max_pages, params):
+        requests.append(dict(params))
+        row = contract(f"O:{len(requests)}", "2025-06-20", 100)
+        response = {"status": "OK", "results": [row]}
+        if pages_needed > max_pages:
+            response["next_url"] = "https://api.polygon.io/next"
+        return response
+
+    return fetch_pages
+
+
+def test_small_chain_takes_one_request(monkeypatch, requests):
+    monkeypatch.setattr(optionchain, "fetch_pages", fake_pages(requests, 1))
+    chain = asyncio.run(fetch_chain("AAPL", strike_gte=90))
+    assert len(requests) == 1
+    assert requests[0]["strike_price.gte"] == 90
+    assert chain["count"] == 1
+    assert "truncated" not in chain
+
+
+def test_large_chain_is_split_into_windows(monkeypatch, requests):
+    monkeypatch.setattr(optionchain, "fetch_pages", fake_pages(requests, 2))
+    chain = asyncio.run(
+        fetch_chain(
+            "AAPL", expiration_gte=date(2025, 6, 16), expiration_lte=date(2025, 7, 16)
+        )
+    )
+    windows = requests[1:]
+    assert len(windows) > 1
+    assert windows[0]["expiration_date.gte"] == "2025-06-16"
+    assert windows[-1]["expiration_date.lte"] == "2025-07-16"
+    assert chain["count"] == len(windows)
+
+
+def test_sort_contracts():
+    rows = [
+        contract("O:B", "2025-07-18", 110),
+        contract("O:A", "2025-06-20", 120),
+        {"details": {"ticker": "O:C"}},
+    ]
+    by_strike = sort_contracts(rows, "strike_price", "desc")
+    assert [r["details"]["ticker"] for r in by_strike] == ["O:A", "O:B", "O:C"]
+    by_ticker = sort_contracts(rows)
+    assert [r["details"]["ticker"] for r in by_ticker] == ["O:A", "O:B", "O:C"]
+    by_expiration = sort_contracts(rows, "expiration_date")
+    assert by_expiration[0]["details"]["ticker"] == "O:A"
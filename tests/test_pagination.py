@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from mcp_polygon import pagination
+from mcp_polygon.pagination import fetch_pages
+
+PAGES = {
+    None: {"status": "OK", "results": [1, 2, 3], "next_url": "page2"},
+    "page2": {"status": "OK", "results": [4, 5, 6], "next_url": "page3"},
+    "page3": {"status": "OK", "results": [7, 8]},
+}
+
+
+@pytest.fixture(autouse=True)
+def polygon(monkeypatch):
+    async def fetch(method, **kwargs):
+        return PAGES[None]
+
+    async def fetch_next(next_url, method=None, page=None):
+        return PAGES[next_url]
+
+    monkeypatch.setattr(pagination, "fetch", fetch)
+    monkeypatch.setattr(pagination, "fetch_next", fetch_next)
+
+
+def test_follows_cursors_until_exhausted():
+    response = asyncio.run(fetch_pages("list_trades", max_pages=10))
+    assert response["results"] == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert response["pages"] == 3
+    assert "next_url" not in response
+
+
+def test_page_budget_leaves_cursor():
+    response = asyncio.run(fetch_pages("list_trades", max_pages=2))
+    assert response["results"] == [1, 2, 3, 4, 5, 6]
+    assert response["next_url"] == "page3"
+
+
+def test_row_budget_truncates():
+    response = asyncio.run(fetch_pages("list_trades", max_rows=4))
+    assert response["results"] == [1, 2, 3, 4]
+    assert response["truncated"] is True
+    assert "next_url" not in response
+
+
+@pytest.mark.parametrize("budget", [{"max_pages": 0}, {"max_rows": -1}])
+def test_rejects_budgets_below_one(budget):
+    with pytest.raises(ValueError):
+        asyncio.run(fetch_pages("list_trades", **budget))
@@ -0,0 +1,130 @@
+import asyncio
+from contextvars import ContextVar
+
+from mcp.server.lowlevel.server import request_ctx
+from mcp.shared.context import RequestContext
+from starlette.requests import Request
+
+from mcp_polygon import ratelimit
+from mcp_polygon.ratelimit import RateLimiter, priority_of
+
+session: ContextVar[str] = ContextVar("session", default="a")
+
+
+def test_disabled_limiter_never_waits():
+    limiter = RateLimiter(0)
+
+    async def main():
+        for _ in range(100):
+            await limiter.acquire()
+
+    asyncio.run(main())
+    assert limiter.throttled == 0
+
+
+def test_burst_then_rate():
+    # 1200 per minute: a token every 50ms after a burst of 3.
+    limiter = RateLimiter(1200, burst=3)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(5):
+            await limiter.acquire()
+        return loop.time() - start
+
+    elapsed = asyncio.run(main())
+    assert limiter.granted == 5
+    assert limiter.throttled == 2
+    assert 0.08 <= elapsed < 0.5
+
+
+def test_higher_priority_served_first():
+    limiter = RateLimiter(1200)
+    order = []
+
+    async def request(name, priority):
+        await limiter.acquire(priority)
+        order.append(name)
+
+    async def main():
+        await limiter.acquire()
+        await asyncio.gather(
+            request("news", priority_of("list_ticker_news")),
+            request("aggs", priority_of("get_aggs")),
+            request("last", priority_of("get_last_trade")),
+        )
+
+    asyncio.run(main())
+    assert order == ["last", "aggs", "news"]
+
+
+def test_sessions_take_turns(monkeypatch):
+    monkeypatch.setattr(ratelimit, "current_session", session.get)
+    limiter = RateLimiter(6000)
+    order = []
+
+    async def request(name, client):
+        session.set(client)
+        await limiter.acquire()
+        order.append(name)
+
+    async def main():
+        await limiter.acquire()
+        await asyncio.gather(
+            request("a1", "a"),
+            request("a2", "a"),
+            request("a3", "a"),
+            request("b1", "b"),
+        )
+
+    asyncio.run(main())
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    limiter = RateLimiter(1200)
+
+    async def main():
+        await limiter.acquire()
+        first = asyncio.ensure_future(limiter.acquire())
+        second = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        first.cancel()
+        await second
+        assert first.cancelled()
+        assert limiter.queued == 0
+
+    asyncio.run(main())
+    assert limiter.granted == 2
+
+
+def http_request(path, headers=(), client="10.0.0.1"):
+    path, _, query = path.partition("?")
+    return Request(
+        {
+            "type": "http",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+            "client": (client, 443),
+        }
+    )
+
+
+def session_of(request):
+    token = request_ctx.set(RequestContext("1", None, object(), None, request))
+    try:
+        return ratelimit.current_session()
+    finally:
+        request_ctx.reset(token)
+
+
+def test_http_clients_behind_one_proxy_are_told_apart():
+    a = http_request("/mcp", [("Mcp-Session-Id", "a")])
+    b = http_request("/mcp", [("Mcp-Session-Id", "b")])
+    assert session_of(a) == "a"
+    assert session_of(b) == "b"
+    assert session_of(http_request("/messages/?session_id=c")) == "c"
+    # Stateless requests fall back to the peer address.
+    assert session_of(http_request("/mcp")) == "10.0.0.1"
@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+import urllib3
+
+from mcp_polygon import resilience
+from mcp_polygon.ratelimit import RateLimiter
+from mcp_polygon.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    DeadlineExceededError,
+    call_with_retries,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience, "time", clock)
+    return clock
+
+
+@pytest.fixture(autouse=True)
+def fresh(monkeypatch):
+    monkeypatch.setattr(resilience, "breakers", {})
+    monkeypatch.setattr(resilience, "rate_limiter", RateLimiter(0))
+    monkeypatch.setattr(resilience, "POLYGON_RETRY_BACKOFF", 0)
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker("aggs", threshold=3, cooldown=10)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_breaker_success_resets_failures(clock):
+    breaker = CircuitBreaker("aggs", threshold=2, cooldown=10)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_breaker_lets_one_trial_through_after_cooldown(clock):
+    breaker = CircuitBreaker("aggs", threshold=1, cooldown=10)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.state == "half_open"
+    assert breaker.allow() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() is False
+
+
+def test_breaker_failed_trial_reopens(clock):
+    breaker = CircuitBreaker("aggs", threshold=1, cooldown=10)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 9
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+
+def test_breaker_ended_trial_lets_another_through(clock):
+    breaker = CircuitBreaker("aggs", threshold=1, cooldown=10)
+    breaker.record_failure()
+    clock.now += 10
+    breaker.allow()
+    breaker.end_trial()
+    assert breaker.allow() is True
+
+
+def test_breaker_disabled_with_zero_threshold(clock):
+    breaker = CircuitBreaker("aggs", threshold=0, cooldown=10)
+    for _ in range(10):
+        breaker.record_failure()
+    assert breaker.allow() is False
+
+
+def test_retries_transient_failures():
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise urllib3.exceptions.ProtocolError("reset")
+        return "ok"
+
+    assert asyncio.run(call_with_retries("get_aggs", call)) == "ok"
+    assert len(attempts) == 3
+    assert resilience.breakers["aggs"].failures == 0
+
+
+def test_bad_request_is_not_retried_or_counted():
+    attempts = []
+
+    async def call():
+        attempts.append(1)
+        raise ValueError("bad ticker")
+
+    with pytest.raises(ValueError):
+        asyncio.run(call_with_retries("get_aggs", call))
+    assert len(attempts) == 1
+    assert resilience.breakers["aggs"].failures == 0
+
+
+def test_rate_limit_queue_does_not_trip_breaker(monkeypatch):
+    # One request per 0.1s: only the first of 8 concurrent calls gets a
+    # token within the deadline. The rest time out while queued, before
+    # reaching Polygon, so the breaker must stay closed.
+    monkeypatch.setattr(resilience, "rate_limiter", RateLimiter(600))
+    monkeypatch.setattr(resilience, "POLYGON_BREAKER_THRESHOLD", 5)
+
+    async def call():
+        return "ok"
+
+    async def main():
+        deadline = asyncio.get_running_loop().time() + 0.05
+        return await asyncio.gather(
+            *(call_with_retries("get_trades", call, deadline) for _ in range(8)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+    assert results.count("ok") == 1
+    assert all(isinstance(r, DeadlineExceededError) for r in results if r != "ok")
+    breaker = resilience.breakers["ticks"]
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_cancelled_trial_is_released(clock):
+    breaker = resilience.breaker_for("get_trades")
+    breaker.threshold = 1
+    breaker.record_failure()
+    clock.now += breaker.cooldown
+
+    async def call():
+        await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.ensure_future(call_with_retries("get_trades", call))
+        await asyncio.sleep(0)
+        assert breaker.state == "half_open"
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert breaker.allow() is True
+
+
+def test_deadline_spent_queueing_does_not_trip_breaker(monkeypatch):
+    # Each call gets its token with only a few milliseconds of the deadline
+    # left, so Polygon never has a fair chance to answer.
+    monkeypatch.setattr(resilience, "POLYGON_BREAKER_THRESHOLD", 1)
+
+    class SlowQueue:
+        async def acquire(self, priority):
+            await asyncio.sleep(0.045)
+
+    monkeypatch.setattr(resilience, "rate_limiter", SlowQueue())
+
+    async def call():
+        await asyncio.sleep(1)
+
+    async def main():
+        for _ in range(3):
+            deadline = asyncio.get_running_loop().time() + 0.05
+            with pytest.raises(DeadlineExceededError):
+                await call_with_retries("get_trades", call, deadline)
+
+    asyncio.run(main())
+    breaker = resilience.breakers["ticks"]
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
@@ -0,0 +1,38 @@
+from mcp_polygon.tickerindex import TickerIndex
+
+ROWS = [
+    {"ticker": "AAPL", "name": "Apple Inc.", "market": "stocks", "cik": "0000320193"},
+    {"ticker": "APLE", "name": "Apple Hospitality REIT", "market": "stocks"},
+    {"ticker": "MSFT", "name": "Microsoft Corp", "market": "stocks"},
+    {"ticker": "X:BTCUSD", "name": "Bitcoin - United States Dollar", "market": "crypto"},
+]
+
+
+def index() -> TickerIndex:
+    return TickerIndex(ROWS, ["stocks", "crypto"], 0)
+
+
+def test_search_ranks_symbol_before_name():
+    results = index().query(search="apl")["results"]
+    assert [row["ticker"] for row in results] == ["APLE"]
+    results = index().query(search="apple")["results"]
+    assert [row["ticker"] for row in results] == ["AAPL", "APLE"]
+
+
+def test_fuzzy_search():
+    results = index().query(search="microsft")["results"]
+    assert [row["ticker"] for row in results] == ["MSFT"]
+
+
+def test_cik_lookup_ignores_leading_zeros():
+    results = index().query(cik="320193")["results"]
+    assert [row["ticker"] for row in results] == ["AAPL"]
+
+
+def test_limit_reports_truncation():
+    response = index().query(market="stocks", limit=2)
+    assert response["count"] == 2
+    assert response["matches"] == 3
+    assert response["truncated"] is True
+    response = index().query(market="stocks", limit=3)
+    assert response["truncated"] is False